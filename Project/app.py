@@ -1,7 +1,9 @@
 from flask import Flask, render_template, request, jsonify
 from flask_cors import CORS
 import os
-import sys
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from dotenv import load_dotenv
 from pathlib import Path
@@ -9,13 +11,19 @@ from pathlib import Path
 # Base directory for this module
 BASE_DIR = Path(__file__).resolve().parent
 
-# Add the email_parser directory to the Python path so we can import from readEmail
-sys.path.append(os.path.join(os.path.dirname(__file__), 'email_parser'))
-
-from parse_email import (
-    fetch_emails,
-    parse_email_content
+from email_parser.parse_email import (
+    EmailStream,
+    parse_email_content,
+    split_parsed_emails,
+    pack_batches,
+    parse_batch
 )
+from email_parser import prefilter
+
+from eventflow import Event
+from event_index import EventStore, parse_query_time, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from payload import Payload, choose_encoding
+from email_jobs import JobManager
 
 load_dotenv()
 
@@ -27,104 +35,324 @@ CORS(app)
 TENANT_ID = os.getenv("TENANT_ID")
 CLIENT_ID = os.getenv("CLIENT_ID")
 
+# Emails are packed several per LLM call and the batches run in parallel, this caps how many calls run at once across all requests
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", 8))
+parse_executor = ThreadPoolExecutor(max_workers=PARSE_WORKERS)
+# Pages of emails fetched but not parsed yet, bounds memory for big mailboxes. Batches from all of them run at once
+FETCH_QUEUE_PAGES = int(os.getenv("FETCH_QUEUE_PAGES", 4))
+# Seconds between keep-alive comments on an idle job stream
+JOB_KEEPALIVE_SECONDS = 15
+# Seconds /api/process_emails waits for its job before answering with the job to poll instead
+JOB_WAIT_SECONDS = int(os.getenv("EMAIL_JOB_WAIT_SECONDS", 120))
+
+# Responses
+def send_payload(payload):
+    """Sends a Payload in the best encoding the browser accepts, or a 304 if it already has this body"""
+    encoding = payload.encoding_for(request.headers.get("Accept-Encoding"))
+    headers = payload.headers(encoding)
+    if payload.matches(request.headers.get("If-None-Match")):
+        headers.pop("Content-Encoding", None)
+        return app.response_class(status=304, headers=headers)
+    return app.response_class(payload.encoded[encoding], mimetype="application/json", headers=headers)
+
+@app.after_request
+def cache_and_compress(response):
+    """Gives every JSON GET response an ETag, answers If-None-Match with a 304 and compresses the rest"""
+    if (request.method != "GET" or response.status_code != 200 or response.mimetype != "application/json"
+            or response.is_streamed or "ETag" in response.headers):
+        return response
+
+    # Only the one encoding this browser gets is compressed, the body is built for this request alone
+    encoding = choose_encoding(request.headers.get("Accept-Encoding"))
+    encodings = [] if encoding == "identity" else [encoding]
+    return send_payload(Payload(response.get_data(), encodings=encodings, fast=True))
+
 # Loads the home page
 @app.route("/")
 def index():
     return render_template("index.html")
 
 # Email processing endpoints
+def parse_email_stream(stream):
+    """Parses the pages of an EmailStream, yielding (email index, parsed) for each email as soon as it's done.
+    A background thread keeps fetching while up to FETCH_QUEUE_PAGES pages are being parsed, and every page's
+    batches go to parse_executor as soon as the page arrives, so batches from different pages run at the same time"""
+    # Pages, the end of the mailbox or a fetch error from the fetch thread, and finished batches from parse_executor
+    updates = queue.Queue()
+    pages_parsing = threading.Semaphore(FETCH_QUEUE_PAGES)
+    stopped = threading.Event()
+
+    def fetch_pages():
+        try:
+            for page in stream:
+                # Stop fetching if nobody is reading anymore, e.g. the browser closed the stream
+                while not stopped.is_set() and not pages_parsing.acquire(timeout=1):
+                    pass
+                if stopped.is_set():
+                    return
+                updates.put(("page", page))
+            updates.put(("done", None))
+        except Exception as e:
+            updates.put(("error", e))
+
+    def submit(page_start, batch):
+        future = parse_executor.submit(parse_batch, batch)
+        future.add_done_callback(lambda future: updates.put(("batch", (page_start, future))))
+
+    threading.Thread(target=fetch_pages, daemon=True).start()
+    try:
+        fetching, first_index = True, 0
+        batches_left = {}   # first email index of a page -> batches of it still running
+        while fetching or batches_left:
+            kind, update = updates.get()
+            if kind == "page":
+                page_start = first_index
+                done, pending = split_parsed_emails(update, first_index)
+                first_index += len(update)
+                batches = pack_batches(pending)
+                if batches:
+                    batches_left[page_start] = len(batches)
+                    for batch in batches:
+                        submit(page_start, batch)
+                else:
+                    pages_parsing.release()
+                yield from done
+            elif kind == "batch":
+                page_start, future = update
+                batches_left[page_start] -= 1
+                if not batches_left[page_start]:
+                    del batches_left[page_start]
+                    pages_parsing.release()
+                yield from future.result()
+            elif kind == "error":
+                raise update
+            else:
+                fetching = False
+    finally:
+        stopped.set()
+
+NO_EMAILS_MESSAGE = "No emails fetched or authentication failed"
+
+def read_email_options(amount, sync):
+    """Validates the amount/sync options shared by every email processing endpoint"""
+    # Validate amount
+    if not isinstance(amount, int) or amount < 1 or amount > 25:
+        amount = 5
+    # With sync, only mail that arrived since the last synced run is fetched and amount is ignored
+    return (None if sync else amount), bool(sync)
+
+def process_emails_job(job, amount, sync):
+    """Fetches and parses emails for a background job, reporting every step through job.emit"""
+    job.emit({'type': 'status', 'message': 'Fetching emails...'})
+    stream = EmailStream(TENANT_ID, CLIENT_ID, amount or 5, sync=sync)
+
+    # Parse the emails in batches at the same time and report each one's events as soon as it's done
+    total_events = 0
+    parsed_events = 0
+    for i, (email_index, parsed) in enumerate(parse_email_stream(stream)):
+        # The total grows as more pages arrive
+        job.emit({'type': 'progress', 'current': i + 1, 'total': stream.fetched})
+
+        if parsed and "events" in parsed:
+            parsed_events += len(parsed["events"])
+            for event in parsed["events"]:
+                if event.get("title") and event.get("start_date"):
+                    if not event.get("description", "").startswith("JUNK"):
+                        total_events += 1
+                        job.emit({'type': 'event', 'event': format_email_event(event), 'email_index': email_index})
+
+    if stream.login_error or (not stream.fetched and not sync):
+        job.emit({'type': 'error', 'message': NO_EMAILS_MESSAGE})
+        return
+
+    # Only remember the sync once every email is parsed, a failed run is repeated next time
+    stream.finish()
+
+    job.emit({'type': 'complete', 'emails_processed': stream.fetched, 'events_found': total_events, 'events_parsed': parsed_events})
+
+# Fetch/parse runs in the background, so a closed browser tab or a reconnecting EventSource doesn't lose any work
+email_jobs = JobManager(process_emails_job)
+
+def submit_email_job(amount, sync):
+    # The same mailbox window only runs once at a time, a repeat submission joins the running job
+    return email_jobs.submit((TENANT_ID, CLIENT_ID, amount, sync), amount, sync)
+
+def parse_last_event_id(value):
+    """Splits an SSE Last-Event-ID of the form "<job id>:<message id>" into its parts, (None, 0) if missing"""
+    job_id, _, message_id = (value or "").rpartition(":")
+    if not message_id.isdigit():
+        return None, 0
+    return job_id or None, int(message_id)
+
+def stream_job(job, last_id=0, attached=False):
+    """Streams a job's messages after last_id as server-sent events until the job finishes"""
+    import json
+
+    def generate():
+        # Not stored in the job and sent without an id, so it doesn't move the client's Last-Event-ID
+        yield f"data: {json.dumps({'type': 'job', 'job_id': job.id, 'attached': attached})}\n\n"
+        after = last_id
+        while True:
+            messages, finished = job.messages_after(after, timeout=JOB_KEEPALIVE_SECONDS)
+            for message_id, message in messages:
+                yield f"id: {job.id}:{message_id}\ndata: {json.dumps(message)}\n\n"
+                after = message_id
+            if finished:
+                return
+            if not messages:
+                # Keeps proxies from closing an idle connection while the model is working
+                yield ": keep-alive\n\n"
+
+    return app.response_class(generate(), mimetype='text/event-stream')
+
 @app.route("/api/process_emails", methods=["POST"])
 def process_emails():
     """Fetch emails, parse them, and return events (no Firebase storage)"""
     try:
         data = request.json
-        amount = data.get("amount", 5)
-
-        # Validate amount
-        if amount < 1 or amount > 25:
-            amount = 5
-
-        # Fetch emails from Outlook
-        emails = fetch_emails(TENANT_ID, CLIENT_ID, amount)
-
-        if not emails:
-            return jsonify({"error": "No emails fetched or authentication failed"}), 400
-
-        # Parse each email for events
-        all_parsed_events = []
-        for email in emails:
-            parsed = parse_email_content(email)
-            if parsed and "events" in parsed:
-                all_parsed_events.extend(parsed["events"])
-
-        # Filter out incomplete events
-        valid_events = []
-        for event in all_parsed_events:
-            if event.get("title") and event.get("start_date"):
-                # Skip JUNK events
-                if not event.get("description", "").startswith("JUNK"):
-                    # Format event for display
-                    formatted_event = format_email_event(event)
-                    valid_events.append(formatted_event)
+        amount, sync = read_email_options(data.get("amount", 5), data.get("sync", False))
+
+        # Runs as a background job like every other email request, this one waits a while for it
+        job, created = submit_email_job(amount, sync)
+        if not job.wait(JOB_WAIT_SECONDS):
+            # Still running, the client can poll or stream the job for the rest
+            return jsonify({**job.summary(), "attached": not created}), 202
+
+        result = job.messages[-1]
+        if result["type"] == "error":
+            status = 400 if result["message"] == NO_EMAILS_MESSAGE else 500
+            return jsonify({"error": result["message"]}), status
 
         return jsonify({
             "status": "success",
-            "emails_processed": len(emails),
-            "events_found": len(all_parsed_events),
-            "events": valid_events
+            "emails_processed": result["emails_processed"],
+            "events_found": result["events_parsed"],
+            # Batches finish in any order, the events are sent back in email order
+            "events": [message["event"] for message in sorted(
+                (message for message in job.messages if message["type"] == "event"), key=lambda message: message["email_index"])]
         })
 
     except Exception as e:
         print(f"Error processing emails: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+# Background job endpoints
+@app.route("/api/jobs/email", methods=["POST"])
+def submit_email_processing():
+    """Start fetching and parsing emails in the background, returns the job to poll or stream"""
+    data = request.json or {}
+    amount, sync = read_email_options(data.get("amount", 5), data.get("sync", False))
+    job, created = submit_email_job(amount, sync)
+    return jsonify({**job.summary(), "attached": not created}), 202
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def email_job_status(job_id):
+    """A job's status, the events found so far and its final result once it has one"""
+    job = email_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job"}), 404
+
+    messages = list(job.messages)
+    finished = [message for message in messages if message["type"] in ("complete", "error")]
+    return jsonify({
+        **job.summary(),
+        "events": [message["event"] for message in messages if message["type"] == "event"],
+        "result": finished[-1] if finished else None
+    })
+
+@app.route("/api/jobs/<job_id>/stream", methods=["GET"])
+def email_job_stream(job_id):
+    """Stream a job's progress, resuming after the Last-Event-ID header (or last_event_id parameter) if given"""
+    job = email_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job"}), 404
+    _, last_id = parse_last_event_id(request.headers.get("Last-Event-ID") or request.args.get("last_event_id"))
+    return stream_job(job, last_id, attached=True)
+
 # Streaming endpoint for real-time event processing
 @app.route("/api/process_emails_stream", methods=["GET"])
 def process_emails_stream():
     """Fetch and parse emails with streaming updates"""
-    import json
-
-    # Get amount from request BEFORE the generator (must be in request context)
-    amount = request.args.get("amount", 5, type=int)
+    # EventSource reconnects to the same url with the last id it saw, pick up that job where it left off
+    job_id, last_id = parse_last_event_id(request.headers.get("Last-Event-ID"))
+    job = email_jobs.get(job_id) if job_id else None
+    if job is not None:
+        return stream_job(job, last_id, attached=True)
+
+    amount, sync = read_email_options(request.args.get("amount", 5, type=int), request.args.get("sync", "0") == "1")
+    job, created = submit_email_job(amount, sync)
+    return stream_job(job, attached=not created)
+
+# Scraped events endpoints
+event_store = EventStore()
+
+@app.route("/api/events", methods=["GET"])
+def events():
+    """Page through scraped events sorted by start time, filtered by time range, tag and text"""
+    try:
+        start = parse_query_time(request.args.get("from"))
+        end = parse_query_time(request.args.get("to"))
+    except ValueError:
+        return jsonify({"error": "from and to must be ISO dates or datetimes"}), 400
 
-    # Validate amount
-    if amount < 1 or amount > 25:
-        amount = 5
+    limit = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+    limit = min(max(limit, 1), MAX_PAGE_SIZE)
 
-    def generate():
-        try:
-            # Fetch emails from Outlook
-            yield f"data: {json.dumps({'type': 'status', 'message': 'Fetching emails...'})}\n\n"
-            emails = fetch_emails(TENANT_ID, CLIENT_ID, amount)
+    try:
+        page, next_cursor = event_store.get_index().query(
+            start=start,
+            end=end,
+            tag=request.args.get("tag") or None,
+            text=request.args.get("q", "").strip() or None,
+            cursor=request.args.get("cursor") or None,
+            limit=limit
+        )
+    except ValueError:
+        return jsonify({"error": "Invalid cursor"}), 400
+    except Exception as e:
+        print(f"Error querying events: {str(e)}")
+        return jsonify({"error": str(e)}), 500
 
-            if not emails:
-                yield f"data: {json.dumps({'type': 'error', 'message': 'No emails fetched or authentication failed'})}\n\n"
-                return
+    return jsonify({"events": page, "next_cursor": next_cursor})
 
-            yield f"data: {json.dumps({'type': 'status', 'message': f'Fetched {len(emails)} emails. Parsing for events...'})}\n\n"
+@app.route("/api/search", methods=["GET"])
+def search():
+    """Search scraped events by text, best match first"""
+    text = request.args.get("q", "").strip()
+    if not text:
+        return jsonify({"error": "No search text provided"}), 400
 
-            # Parse each email and stream results
-            total_events = 0
-            for i, email in enumerate(emails):
-                yield f"data: {json.dumps({'type': 'progress', 'current': i + 1, 'total': len(emails)})}\n\n"
+    limit = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+    limit = min(max(limit, 1), MAX_PAGE_SIZE)
 
-                parsed = parse_email_content(email)
-                if parsed and "events" in parsed:
-                    for event in parsed["events"]:
-                        if event.get("title") and event.get("start_date"):
-                            if not event.get("description", "").startswith("JUNK"):
-                                formatted_event = format_email_event(event)
-                                total_events += 1
-                                # Stream each event as it's found
-                                yield f"data: {json.dumps({'type': 'event', 'event': formatted_event})}\n\n"
+    try:
+        return jsonify({"events": event_store.get_index().search(text, limit)})
+    except Exception as e:
+        print(f"Error searching events: {str(e)}")
+        return jsonify({"error": str(e)}), 500
 
-            # Send completion message
-            yield f"data: {json.dumps({'type': 'complete', 'emails_processed': len(emails), 'events_found': total_events})}\n\n"
+@app.route("/api/events/all", methods=["GET"])
+def all_events():
+    """Every scraped event sorted by start time, serialized and compressed once per catalog change"""
+    try:
+        return send_payload(event_store.get_payload("catalog"))
+    except Exception as e:
+        print(f"Error loading events: {str(e)}")
+        return jsonify({"error": str(e)}), 500
 
-        except Exception as e:
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+@app.route("/api/events/tags", methods=["GET"])
+def event_tags():
+    """List every tag used by the scraped events, for the category filter"""
+    try:
+        return send_payload(event_store.get_payload("tags"))
+    except Exception as e:
+        print(f"Error loading event tags: {str(e)}")
+        return jsonify({"error": str(e)}), 500
 
-    return app.response_class(generate(), mimetype='text/event-stream')
+# How many fetched emails the prefilter skipped instead of sending to the model
+@app.route("/api/prefilter_stats", methods=["GET"])
+def prefilter_stats():
+    return jsonify(prefilter.stats.as_dict())
 
 # Test endpoint
 @app.route("/api/test", methods=["GET"])
@@ -177,55 +405,20 @@ def parse_text():
 
 def format_email_event(event):
     """Format parsed email event for display"""
-    # Parse dates and times
     start_date = event.get("start_date")
-    end_date = event.get("end_date", start_date)
-    start_time = event.get("start_time", "12:00")
-    end_time = event.get("end_time", "23:59")
 
-    # Convert to ISO datetime format for consistency with browse events
+    # Readable date for the event card, the ISO start and end come from the shared Event model
     try:
-        # Try 24-hour format first (HH:MM)
-        try:
-            start_dt = datetime.strptime(f"{start_date} {start_time}", "%Y-%m-%d %H:%M")
-        except ValueError:
-            # Fall back to 12-hour format (HH:MM AM/PM)
-            start_dt = datetime.strptime(f"{start_date} {start_time}", "%Y-%m-%d %I:%M %p")
-
-        start_iso = start_dt.strftime("%Y-%m-%dT%H:%M:%S-06:00")
-        # Format readable date
-        formatted_start_date = start_dt.strftime("%B %d, %Y")
-    except Exception as e:
-        # Fallback if parsing fails
-        print(f"Error parsing start date/time: {e}")
-        start_iso = datetime.now().strftime("%Y-%m-%dT%H:%M:%S-06:00")
+        formatted_start_date = datetime.strptime(start_date, "%Y-%m-%d").strftime("%B %d, %Y")
+    except (TypeError, ValueError):
         formatted_start_date = start_date if start_date else "Unknown Date"
 
-    try:
-        # Try 24-hour format first (HH:MM)
-        try:
-            end_dt = datetime.strptime(f"{end_date} {end_time}", "%Y-%m-%d %H:%M")
-        except ValueError:
-            # Fall back to 12-hour format (HH:MM AM/PM)
-            end_dt = datetime.strptime(f"{end_date} {end_time}", "%Y-%m-%d %I:%M %p")
-
-        end_iso = end_dt.strftime("%Y-%m-%dT%H:%M:%S-06:00")
-    except Exception as e:
-        # Fallback if parsing fails
-        print(f"Error parsing end date/time: {e}")
-        end_iso = datetime.now().strftime("%Y-%m-%dT%H:%M:%S-06:00")
-
     return {
-        "summary": event.get("title", "Untitled Event"),
-        "description": event.get("description", ""),
-        "location": event.get("location", ""),
-        "start": start_iso,
-        "end": end_iso,
+        **Event.from_email(event).to_dict(),
         "start_date": formatted_start_date,
-        "end_date": end_date,
-        "start_time": start_time,
-        "end_time": end_time,
-        "tag": "Email Import"
+        "end_date": event.get("end_date", start_date),
+        "start_time": event.get("start_time", "12:00"),
+        "end_time": event.get("end_time", "23:59"),
     }
 
 if __name__ == "__main__":
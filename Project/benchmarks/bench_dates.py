@@ -0,0 +1,142 @@
+"""Checks and times the shared date parser against the per-event parsing it replaced.
+
+Usage:
+    python -m benchmarks.bench_dates                 # corpus in date_corpus.json only
+    python -m benchmarks.bench_dates --pages pages/  # plus every date on saved general_event pages
+
+Each corpus entry is [date string, expected start, expected end]. Dates read
+from saved pages have no expected values, so they are compared with the old
+parser instead and every difference is listed. The old parser got start times
+without am/pm, times past midnight and multi-day ranges wrong, so differences
+are for review and don't fail the run. Exits with status 1 if any corpus
+result is wrong.
+"""
+#-----------------------IMPORTS & VARIABLES-----------------------#
+# Imports
+from datetime import datetime
+from pathlib import Path
+from zoneinfo import ZoneInfo
+import argparse
+import json
+import re
+import sys
+import time
+
+from web_scraper.dates import parse_general_date, parse_general_dates
+
+# Variables & Constants
+CORPUS_PATH = Path(__file__).resolve().parent / "date_corpus.json"
+DEFAULT_REPEAT = 2000
+#-----------------------OLD PARSER-----------------------#
+def parse_month_to_number(month_str):
+    try:
+        return datetime.strptime(month_str, "%B").month
+    except ValueError:
+        return datetime.strptime(month_str, "%b").month
+
+def legacy_parse_general_date(date_string):
+    """The date parsing scrape_general did inline for every event, kept here as the baseline"""
+    try:
+        month = day = year = None
+        start_hour = start_minute = end_hour = end_minute = None
+
+        if date_match := re.search(r"(\w+)\s+(\d{1,2}),\s+(\d{4})", date_string):
+            month = date_match.group(1)
+            day = int(date_match.group(2))
+            year = int(date_match.group(3))
+
+        if time_range_match := re.search(r"(\d{1,2}):(\d{2})\s*(am|pm)?\s*-\s*(\d{1,2}):(\d{2})\s*(am|pm)", date_string, re.IGNORECASE):
+            start_hour = int(time_range_match.group(1))
+            start_minute = int(time_range_match.group(2))
+            start_meridiem = time_range_match.group(3)
+            end_hour = int(time_range_match.group(4))
+            end_minute = int(time_range_match.group(5))
+            end_meridiem = time_range_match.group(6).lower()
+            start_meridiem = start_meridiem.lower() if start_meridiem else end_meridiem
+            if start_meridiem == "pm" and start_hour != 12:
+                start_hour += 12
+            elif start_meridiem == "am" and start_hour == 12:
+                start_hour = 0
+            if end_meridiem == "pm" and end_hour != 12:
+                end_hour += 12
+            elif end_meridiem == "am" and end_hour == 12:
+                end_hour = 0
+        elif time_match := re.search(r"(\d{1,2}):(\d{2})\s*(am|pm)", date_string, re.IGNORECASE):
+            start_hour = int(time_match.group(1))
+            start_minute = int(time_match.group(2))
+            start_meridiem = time_match.group(3).lower()
+            if start_meridiem == "pm" and start_hour != 12:
+                start_hour += 12
+            elif start_meridiem == "am" and start_hour == 12:
+                start_hour = 0
+            end_hour = (start_hour + 2) % 24
+            end_minute = start_minute
+        else:
+            start_hour, start_minute = 0, 0
+            end_hour, end_minute = 23, 59
+
+        start = end = ""
+        if None not in (month, day, year, start_hour, start_minute):
+            start = datetime(year, parse_month_to_number(month), day, start_hour, start_minute, tzinfo=ZoneInfo("America/Chicago")).isoformat()
+        if None not in (month, day, year, end_hour, end_minute):
+            end = datetime(year, parse_month_to_number(month), day, end_hour, end_minute, tzinfo=ZoneInfo("America/Chicago")).isoformat()
+        return start, end
+    except Exception:
+        return "", ""
+#-----------------------CORPUS-----------------------#
+def page_dates(pages_dir):
+    """Reads the Date field out of every saved general_event page"""
+    from web_scraper.html_parse import parse_sections, GENERAL_EVENT_SECTIONS
+
+    date_strings = []
+    for page in sorted((Path(pages_dir) / "general_event").glob("*.html")):
+        soup = parse_sections(page.read_text(encoding="utf-8"), GENERAL_EVENT_SECTIONS)
+        for dt in soup.find_all("dt"):
+            if dt.text.strip().lower() == "date" and dt.find_next_sibling("dd"):
+                date_strings.append(dt.find_next_sibling("dd").text)
+        soup.decompose()
+    return date_strings
+#-----------------------BENCHMARK-----------------------#
+def check(corpus, page_strings):
+    """Returns the number of corpus date strings the new parser gets wrong, listing page dates it reads differently"""
+    failures = 0
+    for date_string, start, end in corpus:
+        if parse_general_date(date_string) != (start, end):
+            print(f"WRONG   {date_string!r}: got {parse_general_date(date_string)}, expected {(start, end)}")
+            failures += 1
+    for date_string in page_strings:
+        if parse_general_date(date_string) != legacy_parse_general_date(date_string):
+            print(f"CHANGED {date_string!r}: got {parse_general_date(date_string)}, old parser gave {legacy_parse_general_date(date_string)}")
+    return failures
+
+def time_per_string(function, date_strings, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function(date_strings)
+    return (time.perf_counter() - start) * 1e6 / (repeat * len(date_strings))
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and benchmark the shared date parser")
+    parser.add_argument("--pages", help="directory of saved pages from bench_parse.py --save")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="times the corpus is parsed for timing")
+    args = parser.parse_args()
+
+    with open(CORPUS_PATH, "r", encoding="utf-8") as f:
+        corpus = json.load(f)
+    page_strings = page_dates(args.pages) if args.pages else []
+    date_strings = [entry[0] for entry in corpus] + page_strings
+
+    failures = check(corpus, page_strings)
+    print(f"Checked {len(date_strings)} date strings, {failures} wrong")
+
+    legacy_us = time_per_string(lambda strings: [legacy_parse_general_date(s) for s in strings], date_strings, args.repeat)
+    single_us = time_per_string(lambda strings: [parse_general_date(s) for s in strings], date_strings, args.repeat)
+    batch_us = time_per_string(parse_general_dates, date_strings, args.repeat)
+    print(f"{'old parser':<20} {legacy_us:8.2f} us/date")
+    print(f"{'parse_general_date':<20} {single_us:8.2f} us/date  ({legacy_us / single_us:.1f}x)")
+    print(f"{'parse_general_dates':<20} {batch_us:8.2f} us/date  ({legacy_us / batch_us:.1f}x)")
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Checks and times cross-source dedupe against comparing every pair of events.
+
+Usage:
+    python -m benchmarks.bench_dedupe  # 2000 synthetic events
+    python -m benchmarks.bench_dedupe --events 10000 --duplicates 0.3
+
+Synthetic events are relisted under slightly different titles and start times,
+the way a second calendar or source lists them. Reports the duplicates found
+and missed and the time taken by dedupe and by the all-pairs baseline. Exits
+with status 1 if dedupe merges two events that are not duplicates.
+"""
+#-----------------------IMPORTS & VARIABLES-----------------------#
+# Imports
+from datetime import datetime, timedelta
+import argparse
+import random
+import sys
+import time
+
+from eventflow import Event, CENTRAL_TIME
+from web_scraper.dedupe import EventFingerprint, duplicate_groups
+
+# Variables & Constants
+DEFAULT_EVENTS = 2000
+DEFAULT_DUPLICATES = 0.2    # Share of events listed a second time
+BASELINE_LIMIT = 4000   # The all-pairs baseline is skipped above this many events
+KINDS = ["Lecture", "Concert", "Workshop", "Seminar", "Career Fair", "Reading", "Screening", "Recital", "Meetup", "Symposium"]
+# Made-up topic words, real catalogs have a few thousand distinct title words
+SYLLABLES = ["ba", "ko", "ri", "ten", "mo", "la", "vin", "su", "der", "qua", "zel", "pho", "nim", "tra", "go", "ex"]
+PLACES = ["Krannert Center", "Foellinger Auditorium", "Siebel Center", "Illini Union", "State Farm Center", "Grainger Library"]
+#-----------------------CATALOG-----------------------#
+def relist(event, rng):
+    """The same event the way another calendar might list it"""
+    summary = event.summary
+    match rng.randrange(3):
+        case 0:
+            summary = summary.upper()
+        case 1:
+            summary = f"{summary}!"
+        case 2:
+            summary = f"The {summary}"
+    start = datetime.fromisoformat(event.start) + timedelta(minutes=rng.choice([0, 0, 15]))
+    return Event(summary=summary, start=start.isoformat(), location=event.location, tag=event.tag)
+
+def synthetic_events(count, duplicates, seed=1):
+    """Returns (list of Events, set of (first index, duplicate index) pairs that are really the same event)"""
+    rng = random.Random(seed)
+    topics = sorted({"".join(rng.choices(SYLLABLES, k=3)).title() for _ in range(3000)})
+    first = datetime(2025, 9, 1, 8, 0, tzinfo=CENTRAL_TIME)
+    events = []
+    for i in range(count):
+        summary = " ".join(rng.sample(topics, 2)) + " " + rng.choice(KINDS)
+        start = first + timedelta(days=rng.randrange(90), minutes=rng.randrange(0, 12 * 60, 15))
+        events.append(Event(summary=summary, start=start.isoformat(), location=rng.choice(PLACES), tag="General"))
+
+    expected = set()
+    for i in rng.sample(range(count), int(count * duplicates)):
+        expected.add((i, len(events)))
+        events.append(relist(events[i], rng))
+    return events, expected
+#-----------------------BENCHMARK-----------------------#
+def all_pairs_groups(events):
+    """Every pair compared with the same check dedupe uses, the slow baseline"""
+    fingerprints = [EventFingerprint(event) for event in events]
+    pairs = set()
+    for i in range(len(events)):
+        for j in range(i + 1, len(events)):
+            if fingerprints[i].timestamp is not None and fingerprints[j].timestamp is not None and fingerprints[i].same_event(fingerprints[j]):
+                pairs.add((i, j))
+    return pairs
+
+def group_pairs(groups):
+    return {(group[0], i) for group in groups for i in group[1:]}
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and benchmark cross-source dedupe")
+    parser.add_argument("--events", type=int, default=DEFAULT_EVENTS, help="distinct synthetic events")
+    parser.add_argument("--duplicates", type=float, default=DEFAULT_DUPLICATES, help="share of events listed twice")
+    args = parser.parse_args()
+
+    events, expected = synthetic_events(args.events, args.duplicates)
+
+    start = time.perf_counter()
+    found = group_pairs(duplicate_groups(events))
+    dedupe_ms = (time.perf_counter() - start) * 1000
+
+    wrong = found - expected
+    missed = expected - found
+    print(f"{len(events)} events, {len(expected)} duplicates")
+    print(f"dedupe      {dedupe_ms:8.1f} ms  found {len(found & expected)}, missed {len(missed)}, wrong {len(wrong)}")
+    for i, j in sorted(wrong):
+        print(f"WRONG   {events[i].summary!r} merged with {events[j].summary!r}")
+
+    if len(events) <= BASELINE_LIMIT:
+        start = time.perf_counter()
+        baseline = all_pairs_groups(events)
+        baseline_ms = (time.perf_counter() - start) * 1000
+        print(f"all pairs   {baseline_ms:8.1f} ms  found {len(baseline & expected)}  ({baseline_ms / dedupe_ms:.1f}x slower)")
+
+    sys.exit(1 if wrong else 0)
+
+if __name__ == "__main__":
+    main()
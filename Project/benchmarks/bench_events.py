@@ -0,0 +1,107 @@
+"""Compares scraped events kept as plain dicts against the shared Event model.
+
+Usage:
+    python -m benchmarks.bench_events  # 5000 synthetic events
+    python -m benchmarks.bench_events --events 20000
+    python -m benchmarks.bench_events --catalog scraped_events.json
+
+Reports the memory each way of holding the catalog takes, its size as JSON,
+and how long writing and reading it as JSON takes each way. Exits with status
+1 if a round trip through Event changes any event.
+"""
+#-----------------------IMPORTS & VARIABLES-----------------------#
+# Imports
+from datetime import datetime, timedelta
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+from eventflow import Event, CENTRAL_TIME
+
+# Variables & Constants
+DEFAULT_EVENTS = 5000
+DEFAULT_REPEAT = 5
+TAGS = ["Athletics", "Entertainment", "Lecture", "Performance", "Workshop", None]
+#-----------------------CATALOG-----------------------#
+def synthetic_catalog(count):
+    """Returns {id: event dict} shaped like the published catalog"""
+    first = datetime(2025, 9, 1, 9, 0, tzinfo=CENTRAL_TIME)
+    catalog = {}
+    for i in range(count):
+        start = first + timedelta(hours=7 * i)
+        event = {
+            "summary": f"Event {i}: Guest Lecture Series",
+            "description": "Join us for a talk followed by questions and refreshments. " * (i % 4),
+            "htmlLink": f"https://calendars.illinois.edu/detail/7/{33000000 + i}",
+            "start": start.isoformat(),
+            "end": (start + timedelta(hours=2)).isoformat(),
+            "location": f"Room {100 + i % 300}, Siebel Center",
+        }
+        if TAGS[i % len(TAGS)]:
+            event["tag"] = TAGS[i % len(TAGS)]
+        catalog[f"{i:08x}"] = event
+    return catalog
+
+def load_catalog(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+#-----------------------BENCHMARK-----------------------#
+def allocated(build):
+    """Returns (result of build(), bytes it left allocated)"""
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+def best_time(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Event model against plain dicts")
+    parser.add_argument("--events", type=int, default=DEFAULT_EVENTS, help="synthetic events to generate")
+    parser.add_argument("--catalog", help="a downloaded scraped_events.json to use instead")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="runs per timing, the best is reported")
+    args = parser.parse_args()
+
+    catalog_json = json.dumps(load_catalog(args.catalog) if args.catalog else synthetic_catalog(args.events))
+
+    # Memory held by the catalog, read from the same JSON both ways
+    dicts, dict_bytes = allocated(lambda: json.loads(catalog_json))
+    events, event_bytes = allocated(lambda: {event_id: Event.from_dict(event) for event_id, event in json.loads(catalog_json).items()})
+    print(f"{len(events)} events")
+    print(f"{'dicts in memory':<20} {dict_bytes / 1024:10.1f} KiB")
+    print(f"{'Events in memory':<20} {event_bytes / 1024:10.1f} KiB  ({dict_bytes / event_bytes:.1f}x smaller)")
+
+    # Serialized size
+    json_size = len(json.dumps({event_id: event.to_dict() for event_id, event in events.items()}).encode("utf-8"))
+    print(f"{'JSON':<20} {json_size / 1024:10.1f} KiB")
+
+    # Write and read times
+    dict_write = best_time(lambda: json.dumps(dicts), args.repeat)
+    dict_read = best_time(lambda: json.loads(catalog_json), args.repeat)
+    event_write = best_time(lambda: json.dumps({event_id: event.to_dict() for event_id, event in events.items()}), args.repeat)
+    event_read = best_time(lambda: {event_id: Event.from_dict(event) for event_id, event in json.loads(catalog_json).items()}, args.repeat)
+    print(f"{'dicts write/read':<20} {dict_write:8.1f} ms / {dict_read:8.1f} ms")
+    print(f"{'Events write/read':<20} {event_write:8.1f} ms / {event_read:8.1f} ms")
+
+    # Every event must come back exactly as it went in
+    failures = 0
+    round_trip = {event_id: Event.from_dict(event) for event_id, event in json.loads(json.dumps({event_id: event.to_dict() for event_id, event in events.items()})).items()}
+    for event_id, event in round_trip.items():
+        if event.to_dict() != dicts[event_id]:
+            print(f"CHANGED {event_id}: {event.to_dict()} != {dicts[event_id]}")
+            failures += 1
+    print(f"Round trip: {failures} events changed")
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
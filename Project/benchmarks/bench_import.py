@@ -0,0 +1,104 @@
+"""Measures cold-start import time of the Flask app, the email parser and the scraper.
+
+Usage:
+    python -m benchmarks.bench_import                   # every module, default budgets
+    python -m benchmarks.bench_import --budget app=300  # tighter budget for one module
+    python -m benchmarks.bench_import --repeat 10 --top 15
+
+Every import runs in a fresh interpreter with -X importtime, the reported time
+is the median over --repeat runs. Each module also has heavy dependencies that
+must not load at import time (they are imported on first use instead). Exits
+with status 1 if a module is over its budget or loaded one of them.
+"""
+#-----------------------IMPORTS & VARIABLES-----------------------#
+# Imports
+from pathlib import Path
+import argparse
+import re
+import subprocess
+import sys
+
+# Variables & Constants
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_REPEAT = 5
+DEFAULT_TOP = 10
+
+# name -> (module imported from the Project directory, budget in ms, modules that must not be imported with it)
+TARGETS = {
+    "app": ("app", 400, ["openai", "msal", "googleapiclient", "google_auth_oauthlib", "bs4", "requests", "modal", "firebase_admin"]),
+    "parse_email": ("email_parser.parse_email", 200, ["openai", "msal", "googleapiclient", "google_auth_oauthlib", "bs4", "requests"]),
+    "scrape": ("web_scraper.scrape", 400, ["modal", "firebase_admin", "playwright"]),
+}
+
+# "import time: self [us] | cumulative | imported package"
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+#-----------------------MEASURING-----------------------#
+def import_once(module, forbidden):
+    """Imports module in a new interpreter, returning (total ms, {package: cumulative ms}, forbidden modules loaded)"""
+    code = f"import sys, {module}; print(','.join(m for m in {forbidden!r} if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+    )
+
+    total_us = 0
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match is None:
+            continue
+        cumulative[match.group(4)] = int(match.group(2)) / 1000
+        if match.group(4) == module:
+            total_us = int(match.group(2))
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    return total_us / 1000, cumulative, loaded
+
+def startup_imports():
+    """Names imported by an empty interpreter (site, sitecustomize...), left out of the slowest imports"""
+    return set(import_once("sys", [])[1])
+
+def measure(module, forbidden, repeat):
+    """Returns (median total ms, cumulative ms per package from the median run, forbidden modules loaded)"""
+    runs = sorted((import_once(module, forbidden) for _ in range(repeat)), key=lambda run: run[0])
+    total_ms, cumulative, loaded = runs[len(runs) // 2]
+    return total_ms, cumulative, loaded
+#-----------------------BENCHMARK-----------------------#
+def parse_budgets(overrides):
+    budgets = {module: target[1] for module, target in TARGETS.items()}
+    for override in overrides:
+        module, _, ms = override.partition("=")
+        if module not in TARGETS or not ms:
+            raise SystemExit(f"Bad --budget {override!r}, expected one of {list(TARGETS)}=<ms>")
+        budgets[module] = float(ms)
+    return budgets
+
+def main():
+    parser = argparse.ArgumentParser(description="Check cold-start import time against a budget")
+    parser.add_argument("modules", nargs="*", default=list(TARGETS), help="modules to measure (default: all)")
+    parser.add_argument("--budget", action="append", default=[], help="override a budget, e.g. app=300 (ms)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="fresh interpreters per module")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="slowest imports listed per module")
+    args = parser.parse_args()
+    budgets = parse_budgets(args.budget)
+
+    startup = startup_imports()
+    failures = 0
+    for name in args.modules:
+        module, _, forbidden = TARGETS[name]
+        total_ms, cumulative, loaded = measure(module, forbidden, args.repeat)
+        over_budget = total_ms > budgets[name]
+        status = "OVER BUDGET" if over_budget else "ok"
+        print(f"{name:<12} {total_ms:8.1f} ms  (budget {budgets[name]:.0f} ms)  {status}")
+        if loaded:
+            print(f"  loaded at import time, should be lazy: {', '.join(loaded)}")
+        # The module itself and the package it is in are the whole import, not one of its parts
+        parents = {module} | {module.rsplit(".", i)[0] for i in range(1, module.count(".") + 1)}
+        slowest = sorted((item for item in cumulative.items() if item[0] not in parents and item[0] not in startup), key=lambda item: -item[1])
+        for package, ms in slowest[:args.top]:
+            print(f"  {ms:8.1f} ms  {package}")
+        failures += over_budget or bool(loaded)
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
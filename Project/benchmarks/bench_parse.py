@@ -0,0 +1,87 @@
+"""Compares full-page parsing against the scrapers' partial parsing on saved pages.
+
+Usage:
+    python -m benchmarks.bench_parse --save pages/  # download a sample of every page type once
+    python -m benchmarks.bench_parse pages/         # benchmark the saved pages
+
+The pages directory has one folder per page type (general_listing,
+general_event, athletics_schedule, state_farm_listing, state_farm_event)
+holding .html files. Any page type without saved pages is skipped.
+"""
+#-----------------------IMPORTS & VARIABLES-----------------------#
+# Imports
+from pathlib import Path
+import argparse
+import time
+import tracemalloc
+
+from web_scraper.html_parse import parse_sections, SECTIONS
+
+# Variables & Constants
+DEFAULT_REPEAT = 20
+SAMPLE_EVENTS = 10  # Event pages saved per page type with --save
+#-----------------------SAVING PAGES-----------------------#
+def save_pages(pages_dir):
+    """Downloads a few pages of every type the scrapers read"""
+    import requests
+    from web_scraper import scrape
+
+    def save(page_type, urls):
+        folder = Path(pages_dir) / page_type
+        folder.mkdir(parents=True, exist_ok=True)
+        for i, url in enumerate(urls):
+            (folder / f"{i:03d}.html").write_text(requests.get(url, timeout=30).text, encoding="utf-8")
+        print(f"Saved {len(urls)} {page_type} pages")
+
+    general_listing = requests.get(scrape.GENERAL_CALENDAR_LINKS[0], timeout=30).text
+    state_farm_listing = requests.get(scrape.STATE_FARM_CENTER_CALENDAR_LINK, timeout=30).text
+
+    save("general_listing", scrape.GENERAL_CALENDAR_LINKS)
+    save("general_event", scrape.parse_general_listing(general_listing)[:SAMPLE_EVENTS])
+    save("athletics_schedule", scrape.ATHLETIC_TICKET_LINKS)
+    save("state_farm_listing", [scrape.STATE_FARM_CENTER_CALENDAR_LINK])
+    save("state_farm_event", scrape.parse_state_farm_listing(state_farm_listing)[:SAMPLE_EVENTS])
+#-----------------------BENCHMARK-----------------------#
+def measure(pages, sections, repeat):
+    """Returns (average ms per page, average peak KiB per page) for parsing pages with sections"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html_text in pages:
+            parse_sections(html_text, sections).decompose()
+    elapsed_ms = (time.perf_counter() - start) * 1000 / (repeat * len(pages))
+
+    # Peak memory is measured separately, tracemalloc slows parsing down a lot
+    peak_total = 0
+    for html_text in pages:
+        tracemalloc.start()
+        soup = parse_sections(html_text, sections)
+        peak_total += tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        soup.decompose()
+    return elapsed_ms, peak_total / len(pages) / 1024
+
+def run(pages_dir, repeat):
+    print(f"{'page type':<20} {'pages':>5} {'full ms':>9} {'partial ms':>11} {'speedup':>8} {'full KiB':>9} {'partial KiB':>12}")
+    for page_type, sections in SECTIONS.items():
+        files = sorted((Path(pages_dir) / page_type).glob("*.html"))
+        if not files:
+            continue
+        pages = [f.read_text(encoding="utf-8") for f in files]
+
+        full_ms, full_kib = measure(pages, None, repeat)
+        partial_ms, partial_kib = measure(pages, sections, repeat)
+        print(f"{page_type:<20} {len(pages):>5} {full_ms:>9.2f} {partial_ms:>11.2f} {full_ms / partial_ms:>7.1f}x {full_kib:>9.0f} {partial_kib:>12.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark full vs partial HTML parsing on saved scraper pages")
+    parser.add_argument("pages_dir", help="directory with one folder of .html files per page type")
+    parser.add_argument("--save", action="store_true", help="download sample pages into pages_dir first")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="times each page is parsed for timing")
+    args = parser.parse_args()
+
+    if args.save:
+        save_pages(args.pages_dir)
+    run(args.pages_dir, args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#-----------------------IMPORTS & VARIABLES-----------------------#
+# Imports
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+import time
+import uuid
+
+# Variables & Constants
+JOB_WORKERS = int(os.getenv("EMAIL_JOB_WORKERS", 2))            # Fetch/parse jobs running at once, more wait in line
+JOB_TTL_SECONDS = int(os.getenv("EMAIL_JOB_TTL_SECONDS", 900))  # How long a finished job's results can still be read
+FINISHED = ("done", "error")
+#-----------------------JOB-----------------------#
+class EmailJob:
+    """One fetch-and-parse run and every message it has produced so far.
+
+    Messages are the same dicts the stream endpoint sends (status, progress,
+    event, complete or error). Their position in messages, starting at 1, is
+    their id, so a reader that reconnects can ask for everything after the last
+    id it saw and nothing is lost or repeated.
+    """
+
+    def __init__(self, key):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.status = "queued"
+        self.messages = []
+        self.created_at = time.time()
+        self.finished_at = None
+        self.condition = threading.Condition()
+
+    def emit(self, message):
+        with self.condition:
+            self.messages.append(message)
+            if message.get("type") in ("complete", "error"):
+                self.status = "done" if message["type"] == "complete" else "error"
+                self.finished_at = time.time()
+            self.condition.notify_all()
+
+    def start(self):
+        with self.condition:
+            self.status = "running"
+
+    def messages_after(self, last_id, timeout=None):
+        """Waits up to timeout for messages after last_id.
+        Returns (list of (id, message), whether the job has finished)"""
+        with self.condition:
+            if len(self.messages) <= last_id and self.status not in FINISHED:
+                self.condition.wait(timeout)
+            new = list(enumerate(self.messages[last_id:], start=last_id + 1))
+            return new, self.status in FINISHED
+
+    def wait(self, timeout=None):
+        """Blocks until the job finishes, returns whether it did"""
+        with self.condition:
+            return self.condition.wait_for(lambda: self.status in FINISHED, timeout)
+
+    def summary(self):
+        with self.condition:
+            return {
+                "job_id": self.id,
+                "status": self.status,
+                "messages": len(self.messages),
+                "created_at": self.created_at,
+                "finished_at": self.finished_at,
+            }
+#-----------------------JOB MANAGER-----------------------#
+class JobManager:
+    """Runs jobs on a bounded pool of worker threads and keeps their results for JOB_TTL_SECONDS.
+
+    run(job, *args) does the work and reports through job.emit, it must finish
+    by emitting a "complete" or "error" message. Submitting a key that already
+    has a queued or running job returns that job instead of starting another.
+    """
+
+    def __init__(self, run, max_workers=JOB_WORKERS, ttl_seconds=JOB_TTL_SECONDS):
+        self.run = run
+        self.ttl_seconds = ttl_seconds
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="email-job")
+        self.jobs = {}          # job id -> job
+        self.active = {}        # key -> job id of its queued or running job
+        self.lock = threading.Lock()
+
+    def submit(self, key, *args):
+        """Starts a job for key, or joins the one already running. Returns (job, whether it's new)"""
+        with self.lock:
+            self.remove_expired()
+            job_id = self.active.get(key)
+            if job_id is not None and self.jobs[job_id].status not in FINISHED:
+                return self.jobs[job_id], False
+
+            job = EmailJob(key)
+            self.jobs[job.id] = job
+            self.active[key] = job.id
+        self.executor.submit(self.run_job, job, args)
+        return job, True
+
+    def run_job(self, job, args):
+        job.start()
+        try:
+            self.run(job, *args)
+        except Exception as e:
+            print(f"Email job {job.id} failed: {str(e)}")
+            job.emit({"type": "error", "message": str(e)})
+        finally:
+            if job.status not in FINISHED:
+                job.emit({"type": "error", "message": "Job stopped without finishing"})
+            with self.lock:
+                if self.active.get(job.key) == job.id:
+                    del self.active[job.key]
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def remove_expired(self):
+        # Called with self.lock held
+        now = time.time()
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.finished_at and now - job.finished_at > self.ttl_seconds]:
+            del self.jobs[job_id]
@@ -0,0 +1 @@
+"""Fetches Outlook emails and turns them into events. Run from the Project directory: python -m email_parser.parse_email"""
@@ -0,0 +1,183 @@
+import os
+import re
+from .prefilter import SIGNALS
+
+
+# Bodies are cut down to about this many tokens, 0 means no cap
+BODY_TOKEN_CAP = int(os.getenv("EMAIL_BODY_TOKEN_CAP", 1500))
+
+# Elements with nothing readable in them
+DROP_ELEMENTS = ["head", "style", "script"]
+# Elements that start a new line when the email is displayed
+BLOCK_ELEMENTS = ["p", "div", "li", "tr", "table", "h1", "h2", "h3", "h4", "h5", "h6"]
+DROP_SELECTORS = [".gmail_signature"]
+# Containers Gmail, Yahoo and Outlook put the older message in, for replies and forwards alike
+QUOTE_SELECTORS = [".gmail_quote_container", ".gmail_quote", ".yahoo_quoted", "#mail-editor-reference-message-container"]
+# Outlook's header for the older message, the message itself follows it
+OUTLOOK_HEADER_SELECTOR = "#divRplyFwdMsg"
+# How far into a quote or after a quote header to look for what kind it is
+QUOTE_HEAD_CHARS = 500
+QUOTE_HEADER_LINES = 8
+
+# A forwarded message starts here, it is part of what the sender is sharing and is kept
+FORWARD_PATTERNS = [
+    re.compile(r"^-{2,}\s*Forwarded message\s*-{2,}", re.IGNORECASE),
+    re.compile(r"^Begin forwarded message:", re.IGNORECASE),
+]
+FORWARD_MARKER = re.compile(r"-{2,}\s*Forwarded message\s*-{2,}|Begin forwarded message:|\bSubject:\s*(?:FW|Fwd?)\s*:", re.IGNORECASE)
+FORWARD_SUBJECT = re.compile(r"\bSubject:\s*(?:FW|Fwd?)\s*:", re.IGNORECASE)
+# The email's own subject, Outlook's quote header shows the older message's subject for forwards too
+FORWARD_PREFIX = re.compile(r"^\s*(?:FW|Fwd?)\s*:", re.IGNORECASE)
+REPLY_ATTRIBUTION = re.compile(r"\bOn\b.{0,200}?\bwrote:", re.IGNORECASE | re.DOTALL)
+# Everything after one of these lines is quoted history from a reply
+REPLY_PATTERNS = [re.compile(r"^On .{0,200} wrote:\s*$", re.IGNORECASE)]
+# Outlook starts both replies and forwards with these, only the subject below them tells which it is
+QUOTE_HEADER_PATTERNS = [
+    re.compile(r"^-{2,}\s*Original Message\s*-{2,}", re.IGNORECASE),
+    re.compile(r"^From:\s.+\s(?:Sent|Date):\s", re.IGNORECASE),
+]
+# A signature runs from one of these lines to the end of the email or to a forwarded message
+SIGNATURE_PATTERNS = [
+    re.compile(r"^--\s*$"),
+    re.compile(r"^Sent from my (?:iPhone|iPad|Android|Samsung|mobile)", re.IGNORECASE),
+]
+
+# Lines that are boilerplate wherever they show up
+BOILERPLATE_PATTERN = re.compile(
+    r"unsubscribe|manage (?:your )?(?:preferences|subscription)|view (?:this email )?in (?:your )?browser|"
+    r"privacy policy|all rights reserved|confidentiality notice|intended (?:only )?for the (?:named |intended )?recipient|"
+    r"you are receiving this|this email was sent to|\bCAUTION: External",
+    re.IGNORECASE
+)
+QUOTED_LINE = re.compile(r"^\s*>")
+# Outlook puts the quoted message's header on separate lines, "From: ..." then "Sent: ..."
+REPLY_HEADER_FROM = re.compile(r"^From:\s", re.IGNORECASE)
+REPLY_HEADER_SENT = re.compile(r"^(?:Sent|Date):\s", re.IGNORECASE)
+# Long links are almost always tracking links, the model never needs the whole thing
+LONG_URL = re.compile(r"https?://\S{60,}")
+SPACES = re.compile(r"[ \t\u00a0\u200b\u200c\u034f]+")  # Includes the invisible preheader padding newsletters use
+
+# Lines with a date or time are kept even past the token cap, in a signature or when they look like boilerplate
+DATE_TIME_PATTERNS = [pattern for name, pattern, points in SIGNALS if name in ("date", "numeric_date", "time", "weekday")]
+
+
+def estimate_tokens(text):
+    # Roughly 4 characters per token for English text
+    return len(text) // 4 + 1
+
+
+def mentions_date_time(line):
+    return any(pattern.search(line) for pattern in DATE_TIME_PATTERNS)
+
+
+def is_forward(text, forwarded=False):
+    """Whether the start of a quoted message is a forward rather than a reply's quoted history.
+    In an email forwarded whole, every quote without an "On ... wrote:" line is part of the forward"""
+    forward = FORWARD_MARKER.search(text)
+    reply = REPLY_ATTRIBUTION.search(text)
+    if reply is None:
+        return forwarded or forward is not None
+    return forward is not None and forward.start() < reply.start()
+
+
+def drop_reply_quotes(soup, forwarded=False):
+    """Drops the quoted history mail clients put under replies, forwarded messages are kept"""
+    for element in soup.select(", ".join(QUOTE_SELECTORS)):
+        if not element.decomposed and not is_forward(element.get_text(" ")[:QUOTE_HEAD_CHARS], forwarded):
+            element.decompose()
+    # Outlook's header sits next to the quoted message, a reply drops the header and everything after it
+    for element in soup.select(OUTLOOK_HEADER_SELECTOR):
+        if not is_forward(element.get_text(" "), forwarded):
+            for sibling in element.find_next_siblings():
+                sibling.decompose()
+            element.decompose()
+
+
+def html_to_text(soup, forwarded=False):
+    """Turns a parsed HTML email body into text, without quoted replies or signatures the mail client marked"""
+    for element in soup.find_all(DROP_ELEMENTS):
+        element.decompose()
+    for selector in DROP_SELECTORS:
+        for element in soup.select(selector):
+            element.decompose()
+    drop_reply_quotes(soup, forwarded)
+    for element in soup.find_all("br"):
+        element.replace_with("\n")
+    for element in soup.find_all(BLOCK_ELEMENTS):
+        element.append("\n")
+    return soup.get_text()
+
+
+def forwarded_below(lines, i):
+    """Whether the quote header at lines[i] belongs to a forward, from the subject line under it"""
+    return any(FORWARD_SUBJECT.search(line) for line in lines[i:i + QUOTE_HEADER_LINES])
+
+
+def clean_lines(text, forwarded=False):
+    """Drops reply history, signatures and boilerplate lines and collapses whitespace"""
+    text_lines = [SPACES.sub(" ", line).strip() for line in text.splitlines()]
+    lines = []
+    in_signature = False
+    for i, line in enumerate(text_lines):
+        if any(pattern.match(line) for pattern in FORWARD_PATTERNS):
+            # The forward's own From:/Date: header follows
+            forwarded = True
+            in_signature = False
+        elif any(pattern.match(line) for pattern in REPLY_PATTERNS):
+            break
+        elif any(pattern.match(line) for pattern in QUOTE_HEADER_PATTERNS):
+            if not (forwarded or forwarded_below(text_lines, i)):
+                break
+            in_signature = False
+        elif REPLY_HEADER_SENT.match(line) and lines and REPLY_HEADER_FROM.match(lines[-1]):
+            if not (forwarded or forwarded_below(text_lines, i)):
+                lines.pop()
+                break
+            in_signature = False
+        elif any(pattern.match(line) for pattern in SIGNATURE_PATTERNS):
+            in_signature = True
+        if QUOTED_LINE.match(line):
+            continue
+        # A line with a date or time may be the event itself, it is kept wherever it shows up
+        if (in_signature or BOILERPLATE_PATTERN.search(line)) and not mentions_date_time(line):
+            continue
+        line = LONG_URL.sub("[link]", line)
+        # Keep at most one blank line in a row
+        if line or (lines and lines[-1]):
+            lines.append(line)
+    while lines and not lines[-1]:
+        lines.pop()
+    return lines
+
+
+def cap_lines(lines, token_cap):
+    """Keeps lines until token_cap is used up, then only the lines that mention a date or time"""
+    if not token_cap:
+        return lines
+    kept, tokens, truncated = [], 0, False
+    for line in lines:
+        line_tokens = estimate_tokens(line)
+        if not truncated and tokens + line_tokens <= token_cap:
+            kept.append(line)
+            tokens += line_tokens
+            continue
+        if not truncated:
+            kept.append("[...]")
+            truncated = True
+        if mentions_date_time(line):
+            kept.append(line)
+    return kept
+
+
+def slim_body(html_body, token_cap=BODY_TOKEN_CAP, subject=""):
+    """Turns an HTML email body into the text sent to the model, subject tells forwards from replies.
+    Returns (text, tokens before, tokens after), before being the plain get_text() of the whole body"""
+    # bs4 is only imported once there is mail to read, it isn't needed to start the app
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html_body or "", "lxml")
+    tokens_before = estimate_tokens(soup.get_text())
+    forwarded = bool(FORWARD_PREFIX.match(subject or ""))
+    text = "\n".join(cap_lines(clean_lines(html_to_text(soup, forwarded), forwarded), token_cap))
+    soup.decompose()
+    return text, tokens_before, estimate_tokens(text)
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+# Get the directory where this script is located
+BASE_DIR = Path(__file__).resolve().parent
+
+CACHE_PATH = os.getenv("LLM_CACHE_PATH", str(BASE_DIR / "llm_cache.sqlite3"))
+CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", 7 * 24 * 60 * 60))
+CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 5000))
+
+
+def normalize_content(text):
+    # Whitespace differences (e.g. from HTML to text conversion) shouldn't cause a cache miss
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def hash_text(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def cache_key(email_content, prompt, model, today):
+    # Today's date is part of the key because the model resolves relative dates ("next Friday") against it
+    return hash_text(json.dumps([normalize_content(email_content), hash_text(prompt), model, today]))
+
+
+class LLMCache:
+    """SQLite cache of parsed LLM results.
+
+    Entries expire after ttl_seconds, and once there are more than max_entries
+    the least recently used ones are dropped. Every entry remembers the hash of
+    the prompt it was made with, and entries from any other prompt are deleted
+    as soon as a new prompt is seen.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl_seconds=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.prompt_hash = None
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                prompt_hash TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.connection.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+        self.connection.commit()
+
+    def use_prompt(self, prompt):
+        """Drops every entry made with a different prompt, only does work when the prompt actually changes"""
+        prompt_hash = hash_text(prompt)
+        if prompt_hash == self.prompt_hash:
+            return
+        with self.lock:
+            self.connection.execute("DELETE FROM results WHERE prompt_hash != ?", (prompt_hash,))
+            self.connection.commit()
+            self.prompt_hash = prompt_hash
+
+    def get(self, key):
+        now = time.time()
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT value FROM results WHERE key = ? AND created_at > ?", (key, now - self.ttl_seconds)
+            ).fetchone()
+            if row is None:
+                return None
+            self.connection.execute("UPDATE results SET last_used = ? WHERE key = ?", (now, key))
+            self.connection.commit()
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        now = time.time()
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (key, self.prompt_hash or "", json.dumps(value), now, now)
+            )
+            self.evict(now)
+            self.connection.commit()
+
+    def evict(self, now):
+        # Expired entries first, then the least recently used ones over the size limit
+        self.connection.execute("DELETE FROM results WHERE created_at <= ?", (now - self.ttl_seconds,))
+        (count,) = self.connection.execute("SELECT COUNT(*) FROM results").fetchone()
+        if count > self.max_entries:
+            self.connection.execute(
+                "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY last_used LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def clear(self):
+        with self.lock:
+            self.connection.execute("DELETE FROM results")
+            self.connection.commit()
@@ -0,0 +1,84 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+
+# Get the directory where this script is located
+BASE_DIR = Path(__file__).resolve().parent
+
+SYNC_STATE_PATH = Path(os.getenv("MAIL_SYNC_STATE_PATH", BASE_DIR / "mail_sync_state.json"))
+# The first sync only looks this far back instead of downloading the whole inbox
+INITIAL_SYNC_DAYS = int(os.getenv("MAIL_SYNC_INITIAL_DAYS", 7))
+# Processed message ids remembered, oldest ones are forgotten first
+MAX_LEDGER_ENTRIES = int(os.getenv("MAIL_SYNC_MAX_LEDGER", 10000))
+
+GRAPH_URL = "https://graph.microsoft.com/v1.0"
+MESSAGE_FIELDS = "subject,from,receivedDateTime,body"
+
+
+def initial_delta_url(days=INITIAL_SYNC_DAYS):
+    # Delta queries on messages only allow a receivedDateTime filter, and only on the first request
+    since = (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return f"{GRAPH_URL}/me/mailFolders/inbox/messages/delta?$select={MESSAGE_FIELDS}&$filter=receivedDateTime+ge+{since}"
+
+
+class MailSync:
+    """Remembers where the last inbox sync stopped.
+
+    Every account (tenant/client pair) has the deltaLink Graph returned at the
+    end of its last sync, plus a ledger of message ids that have already been
+    parsed. Delta queries also report messages that were only read or moved,
+    the ledger keeps those from being parsed twice. Nothing is saved until
+    commit, so a sync that fails halfway is simply repeated next time.
+    """
+
+    def __init__(self, path=SYNC_STATE_PATH, max_ledger_entries=MAX_LEDGER_ENTRIES):
+        self.path = Path(path)
+        self.max_ledger_entries = max_ledger_entries
+        self.lock = threading.Lock()
+        self.accounts = {}
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.accounts = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Could not read mail sync state, starting over: {e}")
+
+    def account_state(self, account):
+        state = self.accounts.get(account, {})
+        return state.get("delta_link"), OrderedDict.fromkeys(state.get("processed", []))
+
+    def delta_url(self, account):
+        """Returns the deltaLink from the last sync, or a fresh delta query for the first one"""
+        with self.lock:
+            delta_link, _ = self.account_state(account)
+        return delta_link or initial_delta_url()
+
+    def unprocessed(self, account, message_ids):
+        """Returns the ids in message_ids that haven't been parsed yet"""
+        with self.lock:
+            _, processed = self.account_state(account)
+        return [message_id for message_id in message_ids if message_id not in processed]
+
+    def commit(self, account, delta_link, message_ids):
+        """Records message_ids as parsed and delta_link as the place the next sync starts"""
+        with self.lock:
+            _, processed = self.account_state(account)
+            for message_id in message_ids:
+                processed.pop(message_id, None)
+                processed[message_id] = None
+            while len(processed) > self.max_ledger_entries:
+                processed.popitem(last=False)
+
+            self.accounts[account] = {
+                "delta_link": delta_link or self.accounts.get(account, {}).get("delta_link"),
+                "processed": list(processed),
+                "synced_at": datetime.now(timezone.utc).isoformat(),
+            }
+            temp_path = self.path.with_suffix(".tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self.accounts, f)
+            os.replace(temp_path, self.path)
@@ -1,20 +1,19 @@
+# Only light modules are imported here so the Flask app starts fast. msal, requests,
+# openai/httpx and the Google client libraries are imported by the functions that use them
 import os
-import msal
-import requests
 from dotenv import load_dotenv
-from bs4 import BeautifulSoup
-from msal import PublicClientApplication
-import requests
-from bs4 import BeautifulSoup
-from openai import OpenAI
+import threading
+from concurrent.futures import as_completed
 from datetime import datetime, timedelta
 import json
-import google.auth
-from googleapiclient.discovery import build
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
+import hashlib
 import re
 from pathlib import Path
+from eventflow import Event
+from .llm_cache import LLMCache, cache_key
+from . import prefilter
+from .email_body import slim_body, estimate_tokens
+from .mail_sync import MailSync, initial_delta_url, GRAPH_URL, MESSAGE_FIELDS
 
 
 load_dotenv()
@@ -27,69 +26,274 @@ OPENAI_KEY = os.getenv("OPENAI_KEY")
 # Get the directory where this script is located
 BASE_DIR = Path(__file__).resolve().parent
 
-def fetch_emails(tenant_id, client_id, amount):
-    authority = f"https://login.microsoftonline.com/{tenant_id}"
-    scopes = ["Mail.Read"]
-    app = PublicClientApplication(client_id, authority=authority)
-    result = None
-    accounts = app.get_accounts()
-
-    # Attempt to acquire token silently
-    if accounts:
-        result = app.acquire_token_silent(scopes, account=accounts[0])
-        # If silent acquisition fails, fall back to interactive (Browser) method
-    if not result:
-        result = app.acquire_token_interactive(scopes)
-
+MODEL = "openai/gpt-oss-120b"
+PROMPT_PATH = BASE_DIR / "prompt.txt"
+
+# Shared LLM client settings
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", 120))
+LLM_CONNECT_TIMEOUT_SECONDS = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", 10))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", 20))
+
+llm_client = None
+llm_client_lock = threading.Lock()
+
+# Batch mode, several emails share one request (and one copy of the system prompt)
+BATCH_TOKEN_BUDGET = int(os.getenv("LLM_BATCH_TOKEN_BUDGET", 6000))  # Estimated tokens of email text per request
+BATCH_MAX_EMAILS = int(os.getenv("LLM_BATCH_MAX_EMAILS", 10))
+BATCH_INSTRUCTIONS = """BATCH MODE
+The text below contains several emails. Each one starts with a line "=== EMAIL <id> ===".
+Extract the events from every email as usual, all in the single "events" array.
+Every event object MUST also contain an "email_id" field (string) with the id of the email it came from.
+Events from different emails must never be merged together."""
+
+# prompt.txt as last read, and the modification time it had then
+prompt_text = None
+prompt_mtime = None
+prompt_lock = threading.Lock()
+
+# Parsed results are cached on disk, set LLM_CACHE=0 to always call the model
+llm_cache = LLMCache() if os.getenv("LLM_CACHE", "1") != "0" else None
+
+# Emails with no sign of an event are skipped before the model, set PREFILTER=0 to send everything
+USE_PREFILTER = os.getenv("PREFILTER", "1") != "0"
+
+# Microsoft tokens are kept on disk so only the very first login opens the browser
+MAIL_SCOPES = ["Mail.Read"]
+TOKEN_CACHE_PATH = Path(os.getenv("MSAL_TOKEN_CACHE_PATH", BASE_DIR / "msal_token_cache.json"))
+token_cache = None  # Loaded from TOKEN_CACHE_PATH on the first login
+
+# Google Calendar login, credentials are kept in memory once loaded and services are made once per thread
+CALENDAR_SCOPES = ["https://www.googleapis.com/auth/calendar"]
+CALENDAR_TOKEN_PATH = BASE_DIR / "token.json"
+CALENDAR_CREDENTIALS_PATH = BASE_DIR / "credentials.json"
+calendar_credentials = None
+calendar_discovery_doc = None
+calendar_lock = threading.Lock()
+calendar_local = threading.local()
+
+# Google Calendar allows at most 50 requests in one batch
+CALENDAR_BATCH_SIZE = 50
+# Appended to the hash in iCalUIDs, iCalendar wants them globally unique
+CALENDAR_UID_DOMAIN = "@campus-events"
+
+# Incremental inbox sync, the deltaLink and processed message ids survive restarts
+mail_sync = MailSync()
+SYNC_PAGE_SIZE = int(os.getenv("MAIL_SYNC_PAGE_SIZE", 50))
+# Messages per Graph request when fetching the newest emails, parsing starts after the first page
+FETCH_PAGE_SIZE = int(os.getenv("MAIL_FETCH_PAGE_SIZE", 10))
+
+# One MSAL app per (tenant, client), all sharing token_cache
+msal_apps = {}
+msal_lock = threading.Lock()
+
+
+def save_token_cache():
+    """Writes the token cache to disk if a token was added or refreshed since the last save"""
+    if token_cache.has_state_changed:
+        temp_path = TOKEN_CACHE_PATH.with_suffix(".tmp")
+        temp_path.write_text(token_cache.serialize(), encoding="utf-8")
+        os.chmod(temp_path, 0o600)  # It holds refresh tokens
+        os.replace(temp_path, TOKEN_CACHE_PATH)
+        token_cache.has_state_changed = False
+
+
+def get_access_token(tenant_id, client_id, scopes=MAIL_SCOPES):
+    """Returns MSAL's token result, silently from the cache when possible and through the browser otherwise"""
+    from msal import PublicClientApplication, SerializableTokenCache
+
+    global token_cache
+    with msal_lock:
+        if token_cache is None:
+            token_cache = SerializableTokenCache()
+            if TOKEN_CACHE_PATH.exists():
+                token_cache.deserialize(TOKEN_CACHE_PATH.read_text(encoding="utf-8"))
+
+        if (tenant_id, client_id) not in msal_apps:
+            msal_apps[(tenant_id, client_id)] = PublicClientApplication(
+                client_id,
+                authority=f"https://login.microsoftonline.com/{tenant_id}",
+                token_cache=token_cache,
+            )
+        app = msal_apps[(tenant_id, client_id)]
+
+        result = None
+        accounts = app.get_accounts()
+
+        # Attempt to acquire token silently
+        if accounts:
+            result = app.acquire_token_silent(scopes, account=accounts[0])
+            # If silent acquisition fails, fall back to interactive (Browser) method
+        if not result:
+            result = app.acquire_token_interactive(scopes)
+
+        save_token_cache()
+        return result
+
+
+def format_message(msg):
+    """Turns a Graph message into the text sent to the model, returning (text, body tokens before, after slimming)"""
+    sender = "From: " + str(msg["from"]["emailAddress"]["address"])
+    sent_time = msg["receivedDateTime"]
+    subject = "Subject: " + str(msg["subject"])
+    html_body = msg["body"]["content"]
+    # Quoted replies, signatures and boilerplate never reach the model, forwarded messages do
+    plain_text, tokens_before, tokens_after = slim_body(html_body, subject=msg["subject"])
+    combined_text = sender + "\n" + "Send date/time: " + sent_time + "\n" + subject + "\n" + plain_text
+    return combined_text, tokens_before, tokens_after
+
+
+def format_messages(messages, first_number=1):
     email_list = []
-    if "access_token" in result:
+    for message_number, msg in enumerate(messages, start=first_number):
+        combined_text, tokens_before, tokens_after = format_message(msg)
+        email_list.append(combined_text)
+        # One line per email, the full text of a big mailbox would flood the log
+        print(f"{message_number}. {combined_text.splitlines()[0]} | {msg['subject']} "
+              f"(body ~{tokens_before} -> ~{tokens_after} tokens, saved ~{tokens_before - tokens_after})")
+    return email_list
+
+
+class EmailStream:
+    """Fetches emails from Microsoft Graph one page at a time.
+
+    Iterating yields a list of email texts per Graph page, so parsing can start
+    while later pages are still downloading. With sync=True only mail that
+    arrived since the last finished sync is fetched and amount is ignored, call
+    finish() once everything yielded has been parsed to remember where this
+    sync stopped.
+    """
+
+    def __init__(self, tenant_id, client_id, amount=5, sync=False):
+        self.tenant_id = tenant_id
+        self.client_id = client_id
+        self.amount = amount
+        self.sync = sync
+        self.account = f"{tenant_id}/{client_id}"
+        self.fetched = 0
+        self.message_ids = []
+        self.delta_link = None
+        self.login_error = None
+
+    def __iter__(self):
+        result = get_access_token(self.tenant_id, self.client_id)
+        if "access_token" not in result:
+            self.login_error = result.get("error_description") or "Login failed"
+            print("Login error:", self.login_error)
+            return
 
         # Use the access token to call Microsoft Graph API
         headers = {"Authorization": f"Bearer {result['access_token']}"}
-        url = f"https://graph.microsoft.com/v1.0/me/messages?$top={amount}&$select=subject,from,receivedDateTime,body"
-        response = requests.get(url, headers=headers)
-        emails = response.json()
-        message_number = 1
-        for msg in emails.get("value", []):
-            sender = "From: " + str(msg["from"]["emailAddress"]["address"])
-            sent_time = msg["receivedDateTime"]
-            subject = "Subject: " + str(msg["subject"])
-            html_body = msg["body"]["content"]
-            soup = BeautifulSoup(html_body, "html.parser")
-            plain_text = soup.get_text()
-            combined_text = sender + "\n" + "Send date/time: " + sent_time + "\n" + subject + "\n" + plain_text
-            email_list.append(combined_text)
-            print(str(message_number)+ ". " + combined_text)
-            print("___________________________________________________________________")
-            message_number += 1
-    else:
-        print("Login error:", result.get("error_description"))
-    return email_list
+        pages = self.delta_pages(headers) if self.sync else self.recent_pages(headers)
+        for messages in pages:
+            emails = format_messages(messages, self.fetched + 1)
+            self.fetched += len(emails)
+            self.message_ids.extend(msg["id"] for msg in messages)
+            if emails:
+                yield emails
+
+    def recent_pages(self, headers):
+        """The newest amount messages, FETCH_PAGE_SIZE at a time"""
+        import requests
+
+        url = f"{GRAPH_URL}/me/messages?$top={min(self.amount, FETCH_PAGE_SIZE)}&$select=id,{MESSAGE_FIELDS}"
+        remaining = self.amount
+        while url and remaining > 0:
+            page = requests.get(url, headers=headers).json()
+            messages = page.get("value", [])[:remaining]
+            remaining -= len(messages)
+            yield messages
+            url = page.get("@odata.nextLink")
+
+    def delta_pages(self, headers):
+        """Every inbox message that changed since the last finished sync and hasn't been parsed yet"""
+        import requests
+
+        headers = dict(headers, Prefer=f"odata.maxpagesize={SYNC_PAGE_SIZE}")
+        url = mail_sync.delta_url(self.account)
+        seen = set()
+
+        # Follow nextLink pages until Graph hands back the deltaLink for next time
+        while url:
+            response = requests.get(url, headers=headers)
+            if response.status_code == 410:
+                # The saved deltaLink expired, start a fresh sync, the ledger still skips what we've parsed
+                print("Mail sync state expired, starting over")
+                url = initial_delta_url()
+                continue
+            response.raise_for_status()
+            page = response.json()
 
+            # Deleted messages come back as "@removed" entries without content,
+            # and read/moved messages show up again, only parse the ones we haven't
+            messages = [msg for msg in page.get("value", []) if "@removed" not in msg and "body" in msg and msg["id"] not in seen]
+            seen.update(msg["id"] for msg in messages)
+            new_ids = set(mail_sync.unprocessed(self.account, [msg["id"] for msg in messages]))
+            yield [msg for msg in messages if msg["id"] in new_ids]
 
-def parse_email_content(email_content):
+            url = page.get("@odata.nextLink")
+            self.delta_link = page.get("@odata.deltaLink", self.delta_link)
 
-    client = OpenAI(base_url="https://openrouter.ai/api/v1", api_key=OPENAI_KEY)
+    def finish(self):
+        """Marks every message fetched by a sync as parsed, the next sync starts after them"""
+        if self.sync and self.delta_link:
+            mail_sync.commit(self.account, self.delta_link, self.message_ids)
 
-    with open(BASE_DIR / "prompt.txt", "r", encoding="utf-8") as f:
-        guidlines = f.read()
 
-    # Get current date and time for context
+def fetch_emails(tenant_id, client_id, amount):
+    return [email for page in EmailStream(tenant_id, client_id, amount) for email in page]
+
+
+def get_llm_client():
+    """Returns the OpenAI client shared by every call, so connections stay open between emails"""
+    import httpx
+    from openai import OpenAI, DefaultHttpxClient
+
+    global llm_client
+    with llm_client_lock:
+        if llm_client is None:
+            llm_client = OpenAI(
+                base_url="https://openrouter.ai/api/v1",
+                api_key=OPENAI_KEY,
+                timeout=httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=LLM_CONNECT_TIMEOUT_SECONDS),
+                http_client=DefaultHttpxClient(
+                    limits=httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_CONNECTIONS)
+                ),
+            )
+        return llm_client
+
+
+def load_prompt():
+    """Returns the contents of prompt.txt, only reading the file again when it has been modified"""
+    global prompt_text, prompt_mtime
+    with prompt_lock:
+        mtime = os.stat(PROMPT_PATH).st_mtime_ns
+        if mtime != prompt_mtime:
+            with open(PROMPT_PATH, "r", encoding="utf-8") as f:
+                prompt_text = f.read()
+            prompt_mtime = mtime
+        return prompt_text
+
+
+REQUIRED_FIELDS = ["title", "start_date", "end_date", "start_time", "end_time", "location", "description"]
+
+
+def date_context():
+    """Returns today's date and the date/time header the model resolves relative dates against"""
     now = datetime.now()
     current_date = now.strftime("%Y-%m-%d")
     current_time = now.strftime("%H:%M")
     current_day = now.strftime("%A")
-
-    # Add context to the email content
-    contextual_content = f"""Current Date and Time Context:
+    context = f"""Current Date and Time Context:
 - Today's date: {current_date} ({current_day})
-- Current time: {current_time}
+- Current time: {current_time}"""
+    return current_date, context
 
-Email/Text to parse:
-{email_content}"""
 
+def request_events_json(guidlines, contextual_content):
+    """Sends one chat completion and returns the model's raw output"""
+    client = get_llm_client()
     response = client.chat.completions.create(
-        model="openai/gpt-oss-120b",
+        model=MODEL,
         messages=[
             {"role": "system", "content": guidlines},
             {"role": "user", "content": contextual_content},
@@ -103,10 +307,14 @@ Email/Text to parse:
     print("\n\n\n")
     print("RAW OUTPUT")
     print(raw_output)
+    return raw_output
 
+
+def load_model_json(raw_output):
+    """Parses the model's output as JSON, trimming around the outer braces if needed. Returns None if it can't"""
     try:
         # First attempt: parse as-is
-        parsed_json = json.loads(raw_output)
+        return json.loads(raw_output)
     except json.JSONDecodeError as e:
         print(f"Model returned invalid JSON: {e}")
         print("Raw output was:\n", raw_output)
@@ -120,82 +328,303 @@ Email/Text to parse:
             cleaned = raw_output[start:end]
             parsed_json = json.loads(cleaned)
             print("Successfully recovered JSON after trimming")
+            return parsed_json
         except Exception as e2:
             print(f"Failed to recover JSON: {e2}")
-            # If still broken, return empty structure instead of crashing
-            parsed_json = {"events": []}
+            return None
+
+
+def is_complete_event(event):
+    # Check if event has all required fields (as dict keys)
+    return isinstance(event, dict) and all(field in event for field in REQUIRED_FIELDS)
+
+
+def parse_email_content(email_content):
+
+    guidlines = load_prompt()
+
+    # Get current date and time for context
+    current_date, context = date_context()
+
+    # Reuse the result if we already parsed this email with the same prompt and model today
+    if llm_cache:
+        llm_cache.use_prompt(guidlines)
+        key = cache_key(email_content, guidlines, MODEL, current_date)
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return cached
+
+    # Add context to the email content
+    contextual_content = f"""{context}
+
+Email/Text to parse:
+{email_content}"""
+
+    raw_output = request_events_json(guidlines, contextual_content)
+    parsed_json = load_model_json(raw_output)
+    if parsed_json is None:
+        # If still broken, return empty structure instead of crashing
+        return {"events": []}
 
     # Validate and clean events (remove any with duplicate or missing required fields)
     if "events" in parsed_json and isinstance(parsed_json["events"], list):
         cleaned_events = []
-        required_fields = ["title", "start_date", "end_date", "start_time", "end_time", "location", "description"]
 
         for event in parsed_json["events"]:
-            # Check if event has all required fields (as dict keys)
-            if all(field in event for field in required_fields):
+            if is_complete_event(event):
                 cleaned_events.append(event)
             else:
                 print(f"Skipping malformed event: {event}")
 
         parsed_json["events"] = cleaned_events
 
+        # Only cache real answers, not the empty fallback for broken JSON
+        if llm_cache:
+            llm_cache.put(key, parsed_json)
+
     return parsed_json
 
 
-def get_calendar_service():
+def pack_batches(emails, token_budget=BATCH_TOKEN_BUDGET, max_emails=BATCH_MAX_EMAILS):
+    """Groups (id, email) pairs into batches whose email text fits in token_budget.
+    An email too big for the budget on its own gets a batch to itself"""
+    batches = []
+    batch, batch_tokens = [], 0
+    for email_id, email in emails:
+        tokens = estimate_tokens(email)
+        if batch and (batch_tokens + tokens > token_budget or len(batch) == max_emails):
+            batches.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append((email_id, email))
+        batch_tokens += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def parse_batch(batch):
+    """Parses a batch of (id, email) pairs in one request, returning (id, parsed) pairs.
+    Any email whose events come back malformed, or the whole batch if the request fails or an event names
+    no email in the batch, is re-parsed on its own. Only results from a batch answer that checks out are cached"""
+    if len(batch) == 1:
+        return [(batch[0][0], parse_email_content(batch[0][1]))]
+
+    guidlines = load_prompt()
+    current_date, context = date_context()
+
+    # Every email is marked with its id so the model can say which email each event came from
+    emails_text = "\n\n".join(f"=== EMAIL {email_id} ===\n{email}" for email_id, email in batch)
+    contextual_content = f"""{context}
+
+{BATCH_INSTRUCTIONS}
+
+Emails/Text to parse:
+{emails_text}"""
+
+    events_by_email = {str(email_id): [] for email_id, _ in batch}
+    failed = set()
+    try:
+        parsed_json = load_model_json(request_events_json(guidlines, contextual_content))
+        if parsed_json is None or not isinstance(parsed_json.get("events"), list):
+            raise ValueError("Batch response has no events list")
 
-    SCOPES = ["https://www.googleapis.com/auth/calendar"]
+        # Split the events back out by email
+        for event in parsed_json["events"]:
+            email_id = str(event.pop("email_id", "")) if isinstance(event, dict) else ""
+            if email_id not in events_by_email:
+                # Can't tell whose event it is, so none of the batch's results can be trusted
+                raise ValueError(f"Batch event with unknown email_id: {event}")
+            if is_complete_event(event):
+                events_by_email[email_id].append(event)
+            else:
+                print(f"Malformed event for email {email_id}, parsing it on its own: {event}")
+                failed.add(email_id)
+    except Exception as e:
+        print(f"Batch request failed, parsing each email on its own: {e}")
+        failed = set(events_by_email)
+
+    results = []
+    for email_id, email in batch:
+        if str(email_id) in failed:
+            results.append((email_id, parse_email_content(email)))
+            continue
+
+        parsed = {"events": events_by_email[str(email_id)]}
+        if llm_cache:
+            llm_cache.use_prompt(guidlines)
+            llm_cache.put(cache_key(email, guidlines, MODEL, current_date), parsed)
+        results.append((email_id, parsed))
+    return results
+
+
+def split_parsed_emails(emails, first_index=0):
+    """Returns ((index, parsed) pairs for emails the prefilter skips or that are cached, (index, email) pairs left to parse).
+    Indexes start at first_index"""
+    done, pending = [], []
+    for index, email in enumerate(emails, start=first_index):
+        if USE_PREFILTER and not prefilter.should_parse(email):
+            done.append((index, {"events": []}))
+            continue
+
+        cached = None
+        if llm_cache:
+            guidlines = load_prompt()
+            llm_cache.use_prompt(guidlines)
+            cached = llm_cache.get(cache_key(email, guidlines, MODEL, date_context()[0]))
+        if cached is not None:
+            done.append((index, cached))
+        else:
+            pending.append((index, email))
+    return done, pending
 
-    creds = None
-    token_path = BASE_DIR / "token.json"
-    credentials_path = BASE_DIR / "credentials.json"
 
-    if os.path.exists(token_path):
-        from google.oauth2.credentials import Credentials
-        creds = Credentials.from_authorized_user_file(str(token_path), SCOPES)
+def iter_parsed_emails(emails, token_budget=BATCH_TOKEN_BUDGET, executor=None):
+    """Parses emails several per request, yielding (index, parsed) as each one is done.
+    Emails the prefilter skips and cached emails come first, then whole batches as they finish,
+    running batches on executor if one is given"""
+    done, pending = split_parsed_emails(emails)
+    yield from done
+
+    batches = pack_batches(pending, token_budget)
+    if executor is None:
+        for batch in batches:
+            yield from parse_batch(batch)
+    else:
+        futures = [executor.submit(parse_batch, batch) for batch in batches]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def parse_email_batch(emails, token_budget=BATCH_TOKEN_BUDGET, executor=None):
+    """Parses a list of emails with as few requests as token_budget allows, returning results in email order"""
+    results = [None] * len(emails)
+    for index, parsed in iter_parsed_emails(emails, token_budget, executor):
+        results[index] = parsed
+    return results
+
+
+def get_calendar_credentials():
+    """Returns the Google credentials shared by every thread, only touching token.json or the network
+    the first time and when they have expired"""
+    import google.auth.transport.requests
+    from google_auth_oauthlib.flow import InstalledAppFlow
+
+    global calendar_credentials
+    with calendar_lock:
+        creds = calendar_credentials
+        if creds is None and os.path.exists(CALENDAR_TOKEN_PATH):
+            from google.oauth2.credentials import Credentials
+            creds = Credentials.from_authorized_user_file(str(CALENDAR_TOKEN_PATH), CALENDAR_SCOPES)
+
+        if not creds or not creds.valid:
+            if creds and creds.expired and creds.refresh_token:
+                creds.refresh(google.auth.transport.requests.Request())
+            else:
+                flow = InstalledAppFlow.from_client_secrets_file(str(CALENDAR_CREDENTIALS_PATH), CALENDAR_SCOPES)
+                creds = flow.run_local_server(port=0)
+
+            with open(CALENDAR_TOKEN_PATH, "w") as token:
+                token.write(creds.to_json())
+
+        calendar_credentials = creds
+        return creds
 
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(google.auth.transport.requests.Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(str(credentials_path), SCOPES)
-            creds = flow.run_local_server(port=0)
 
-        with open(token_path, "w") as token:
-            token.write(creds.to_json())
+def get_calendar_service():
+    """Returns this thread's Calendar service, built once per thread from the bundled discovery document.
+    Service objects aren't thread safe (they share one httplib2 connection), so threads don't share them"""
+    from googleapiclient import discovery_cache
+    from googleapiclient.discovery import build_from_document
+
+    global calendar_discovery_doc
+    creds = get_calendar_credentials()
+    if getattr(calendar_local, "credentials", None) is not creds:
+        with calendar_lock:
+            if calendar_discovery_doc is None:
+                calendar_discovery_doc = discovery_cache.get_static_doc("calendar", "v3")
+        calendar_local.service = build_from_document(calendar_discovery_doc, credentials=creds)
+        calendar_local.credentials = creds
+    return calendar_local.service
+
+
+def event_uid(event_data):
+    """A stable iCalUID for an event, importing the same event again updates it instead of duplicating it.
+    Built from the parsed fields rather than the Event, so events imported earlier keep their uid"""
+    key = "|".join(
+        re.sub(r"\s+", " ", str(event_data.get(field) or "")).strip().lower()
+        for field in ("title", "start_date", "start_time", "location")
+    )
+    return hashlib.sha1(key.encode("utf-8")).hexdigest() + CALENDAR_UID_DOMAIN
 
-    return build("calendar", "v3", credentials=creds)
 
+def calendar_events(parsed_events):
+    """Returns the events from parse_email_content that have enough to go on a calendar"""
+    events = []
+    for event_data in parsed_events:
+        if not event_data.get("title") or not event_data.get("start_date"):
+            print("Skipping incomplete event:", event_data)
+            continue
+        events.append(event_data)
+    return events
 
-def create_event(event_data, service):
 
-    start_time = event_data.get("start_time") or "09:00"
-    end_time   = event_data.get("end_time")   or "10:00"
+def build_event_body(event_data):
+    """Raises ValueError if the date or time can't be read"""
     start_date = event_data.get("start_date") or datetime.now().strftime("%Y-%m-%d")
-    end_date   = event_data.get("end_date")   or start_date
-    location = event_data.get("location", "")
-    description = event_data.get("description", event_data.get("title", ""))
-    title = event_data.get("title", "Untitled Event")
-
-    # Parse dates and times
-    start_dt = datetime.strptime(f"{start_date} {start_time}", "%Y-%m-%d %H:%M")
-    end_dt = datetime.strptime(f"{end_date} {end_time}", "%Y-%m-%d %H:%M")
-
-    #Format as RFC3339
-    start_str = start_dt.strftime("%Y-%m-%dT%H:%M:%S")
-    end_str = end_dt.strftime("%Y-%m-%dT%H:%M:%S")
-
-    event = {
-        "summary": event_data.get("title", "Untitled Event"),
-        "description": event_data.get("description", ""),
-        "location": event_data.get("location", ""),
-        "start": {"dateTime": start_str, "timeZone": "America/Chicago"},
-        "end": {"dateTime": end_str, "timeZone": "America/Chicago"},
+    event = Event.from_email({**event_data, "start_date": start_date}, start_time="09:00", end_time="10:00", strict=True)
+
+    # Event times are already RFC3339 with the Central Time offset
+    return {
+        "iCalUID": event_uid(event_data),
+        "summary": event.summary,
+        "description": event.description,
+        "location": event.location,
+        "start": {"dateTime": event.start, "timeZone": "America/Chicago"},
+        "end": {"dateTime": event.end, "timeZone": "America/Chicago"},
     }
-    
-    created_event = service.events().insert(calendarId="primary", body=event).execute()
+
+
+def create_event(event_data, service, calendar_id="primary"):
+    # import_ matches on iCalUID, so adding the same event twice just updates it
+    created_event = service.events().import_(calendarId=calendar_id, body=build_event_body(event_data)).execute()
     print("Event created:", created_event.get("htmlLink"))
 
+
+def create_events(events, service, calendar_id="primary"):
+    """Adds many events with one HTTP request per CALENDAR_BATCH_SIZE events.
+    Returns (number added or updated, number failed)"""
+    bodies = {}
+    failed = 0
+    for event_data in events:
+        try:
+            body = build_event_body(event_data)
+        except ValueError as e:
+            print(f"Skipping event with unreadable date/time {event_data.get('title')}: {e}")
+            failed += 1
+            continue
+        # The same event from two emails only needs to be sent once
+        bodies[body["iCalUID"]] = body
+
+    results = {"done": 0, "failed": failed}
+
+    def on_response(request_id, response, exception):
+        if exception is not None:
+            print(f"Failed to add event {request_id}: {exception}")
+            results["failed"] += 1
+        else:
+            print("Event created:", response.get("htmlLink"))
+            results["done"] += 1
+
+    bodies = list(bodies.values())
+    for i in range(0, len(bodies), CALENDAR_BATCH_SIZE):
+        batch = service.new_batch_http_request(callback=on_response)
+        for body in bodies[i:i + CALENDAR_BATCH_SIZE]:
+            batch.add(service.events().import_(calendarId=calendar_id, body=body), request_id=body["iCalUID"])
+        batch.execute()
+
+    return results["done"], results["failed"]
+
+
 def extract_json(text):
     # Find the first JSON object or array
     m = re.search(r'(\{.*\}|\[.*\])', text, re.S)
@@ -235,6 +664,7 @@ def extract_json(text):
         # As last resort, raise with context
         raise ValueError(f"Failed to parse JSON. Last attempt error: {e}\nCandidate:\n{fixed2[:1000]}") from e
 
+# Run from the Project directory: python -m email_parser.parse_email
 if __name__ == "__main__":
     TENANT_ID = os.getenv("TENANT_ID")
     CLIENT_ID = os.getenv("CLIENT_ID")
@@ -244,19 +674,16 @@ if __name__ == "__main__":
         amount = int(amount) if int(amount) > 0 and int(amount) <= 25 else 5
         emails = fetch_emails(TENANT_ID, CLIENT_ID, amount)
 
-        event_jsons = []
         service = get_calendar_service()
-        for email in emails:
-            event_jsons.append(parse_email_content(email))
+        event_jsons = parse_email_batch(emails)
 
+        events = []
         for event_json in event_jsons:
             if not event_json or "events" not in event_json:
                 continue
-            for e in event_json["events"]:
-                if not e.get("title") or not e.get("start_date"):
-                    print("Skipping incomplete event:", e)
-                    continue
-                create_event(e, service)
+            events.extend(calendar_events(event_json["events"]))
+        done, failed = create_events(events, service)
+        print(f"Added {done} events to the calendar, {failed} failed")
     elif amount.lower() == "custom":
         custom_event = input("Enter your custom event description: ")
         # current time and date to help with parsing
@@ -269,8 +696,4 @@ if __name__ == "__main__":
             print("No events found in the response.")
         else:
             service = get_calendar_service()
-            for e in event_json["events"]:
-                if not e.get("title") or not e.get("start_date"):
-                    print("Skipping incomplete event:", e)
-                    continue
-                create_event(e, service)
+            create_events(calendar_events(event_json["events"]), service)
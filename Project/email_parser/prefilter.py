@@ -0,0 +1,111 @@
+import os
+import re
+import threading
+
+
+# Emails scoring below this are skipped without calling the model, 0 sends every email
+MIN_SCORE = int(os.getenv("PREFILTER_MIN_SCORE", 2))
+
+# Comma separated addresses or domains, e.g. "acm@illinois.edu,grainger.illinois.edu"
+# Allowed senders are always sent to the model, denied senders never are
+ALLOW_SENDERS = [s.strip().lower() for s in os.getenv("PREFILTER_ALLOW_SENDERS", "").split(",") if s.strip()]
+DENY_SENDERS = [s.strip().lower() for s in os.getenv("PREFILTER_DENY_SENDERS", "").split(",") if s.strip()]
+
+MONTH_WORDS = r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sept?(?:ember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)"
+WEEKDAY_WORDS = r"(?:mon|tues?|wed(?:nes)?|thu(?:rs?)?|fri|sat(?:ur)?|sun)(?:day)?"
+
+# (name, pattern, points), an email gets the points once per signal however many times it matches
+SIGNALS = [
+    # "Nov 5", "November 5th", "5 November"
+    ("date", re.compile(rf"\b{MONTH_WORDS}\.?\s+\d{{1,2}}(?:st|nd|rd|th)?\b|\b\d{{1,2}}(?:st|nd|rd|th)?\s+{MONTH_WORDS}\b", re.IGNORECASE), 2),
+    # "11/5", "11/05/2025", "2025-11-05"
+    ("numeric_date", re.compile(r"\b\d{1,2}/\d{1,2}(?:/\d{2,4})?\b|\b\d{4}-\d{2}-\d{2}\b"), 2),
+    # "7pm", "7:30 p.m.", "19:30", "noon"
+    ("time", re.compile(r"\b\d{1,2}(?::\d{2})?\s*(?:[ap]\.?m\.?)(?!\w)|\b\d{1,2}:\d{2}\b|\bnoon\b", re.IGNORECASE), 2),
+    ("weekday", re.compile(rf"\b{WEEKDAY_WORDS}\b", re.IGNORECASE), 1),
+    ("relative_day", re.compile(r"\b(?:today|tonight|tomorrow|this (?:week|weekend)|next (?:week|month))\b", re.IGNORECASE), 1),
+    ("location", re.compile(r"\b(?:room|rm\.?|hall|building|bldg|auditorium|lounge|quad|library|center|zoom|teams meeting|location|venue)\b", re.IGNORECASE), 1),
+    ("event_word", re.compile(r"\b(?:event|meeting|workshop|seminar|lecture|talk|info session|career fair|office hours|rsvp|register|deadline|due|join us|interview|exam|party|game|concert|reception)\b", re.IGNORECASE), 1),
+]
+
+# The header lines fetch_emails adds, the send date/time would match every date signal
+HEADER_PATTERN = re.compile(r"^(?:From|Send date/time|Subject):.*$", re.MULTILINE)
+SENDER_PATTERN = re.compile(r"^From:\s*(\S+)", re.MULTILINE)
+SUBJECT_PATTERN = re.compile(r"^Subject:(.*)$", re.MULTILINE)
+
+
+def sender_of(email_content):
+    match = SENDER_PATTERN.search(email_content)
+    return match.group(1).lower() if match else ""
+
+
+def sender_matches(sender, entries):
+    # An entry matches the whole address, or the domain (and its subdomains)
+    domain = sender.rpartition("@")[2]
+    return any(sender == entry or domain == entry or domain.endswith("." + entry) for entry in entries)
+
+
+def score_email(email_content):
+    """Returns (score, names of the signals found) for how likely an email is to mention an event"""
+    subject = SUBJECT_PATTERN.search(email_content)
+    text = HEADER_PATTERN.sub("", email_content) + "\n" + (subject.group(1) if subject else "")
+    found = [name for name, pattern, points in SIGNALS if pattern.search(text)]
+    score = sum(points for name, pattern, points in SIGNALS if name in found)
+    return score, found
+
+
+class PrefilterStats:
+    """Counts how many emails the prefilter looked at and why the skipped ones were skipped"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.checked = 0
+        self.passed = 0
+        self.skipped_low_score = 0
+        self.skipped_denied_sender = 0
+
+    def record(self, field):
+        with self.lock:
+            self.checked += 1
+            setattr(self, field, getattr(self, field) + 1)
+
+    def as_dict(self):
+        with self.lock:
+            skipped = self.skipped_low_score + self.skipped_denied_sender
+            return {
+                "min_score": MIN_SCORE,
+                "checked": self.checked,
+                "passed": self.passed,
+                "skipped": skipped,
+                "skipped_low_score": self.skipped_low_score,
+                "skipped_denied_sender": self.skipped_denied_sender,
+                "skip_rate": skipped / self.checked if self.checked else 0.0,
+            }
+
+
+stats = PrefilterStats()
+
+
+def should_parse(email_content, min_score=None):
+    """Decides whether an email is worth an LLM call, recording the decision in stats"""
+    min_score = MIN_SCORE if min_score is None else min_score
+    sender = sender_of(email_content)
+
+    if sender and sender_matches(sender, ALLOW_SENDERS):
+        stats.record("passed")
+        return True
+    if sender and sender_matches(sender, DENY_SENDERS):
+        stats.record("skipped_denied_sender")
+        print(f"Prefilter skipped email from denied sender {sender}")
+        return False
+
+    score, found = score_email(email_content)
+    if score < min_score:
+        stats.record("skipped_low_score")
+        print(f"Prefilter skipped email from {sender or 'unknown sender'} (score {score}, signals {found})")
+        return False
+    stats.record("passed")
+    return True
@@ -0,0 +1,189 @@
+#-----------------------IMPORTS & VARIABLES-----------------------#
+# Imports
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from zoneinfo import ZoneInfo
+import os
+import threading
+import time
+from eventflow import Event, catalog_dict, event_hash, diff_events
+from search_index import SearchIndex
+from payload import Payload
+
+# Variables & Constants
+EVENTS_SOURCE_URL = os.getenv("EVENTS_SOURCE_URL", "https://eventflowdatabase-default-rtdb.firebaseio.com/scraped_events.json")
+EVENTS_REFRESH_SECONDS = int(os.getenv("EVENTS_REFRESH_SECONDS", 600))   # How long a downloaded catalog is served before re-downloading
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+NO_START = float("inf")     # Events without a start time sort after every dated event
+CENTRAL_TIME = ZoneInfo("America/Chicago")
+#-----------------------HELPER FUNCTIONS-----------------------#
+def parse_query_time(value):
+    """Parses an ISO date or datetime from a query string into a timestamp, dates without a zone are Central Time"""
+    if not value:
+        return None
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=CENTRAL_TIME)
+    return dt.timestamp()
+
+def start_timestamp(event):
+    try:
+        return parse_query_time(event.start) or NO_START
+    except (TypeError, ValueError):
+        return NO_START
+
+def encode_cursor(key):
+    return f"{key[0]}_{key[1]}"
+
+def decode_cursor(cursor):
+    """Turns a cursor back into the (timestamp, id) key of the last event on the previous page"""
+    timestamp, event_id = cursor.split("_", 1)
+    return (float(timestamp), event_id)
+#-----------------------INDEX-----------------------#
+class EventIndex:
+    """Scraped events kept sorted by start time.
+
+    Every event is stored under a (start timestamp, id) key in one sorted list,
+    plus one sorted list per tag, so a time range is two bisects and a page is a
+    slice. Cursors are the key of the last event returned, so paging stays
+    correct even if events are added or removed between requests. Text
+    searches go through a SearchIndex kept in step with the events. Events are
+    kept as Event objects, only the page being returned is turned into dicts.
+    """
+
+    def __init__(self, events=None):
+        self.events = {}        # id -> Event
+        self.keys = {}          # id -> (start timestamp, id)
+        self.order = []         # every key, sorted
+        self.by_tag = {}        # tag -> that tag's keys, sorted
+        self.search_index = SearchIndex()
+        self.lock = threading.RLock()  # Events change while requests are reading them
+        for event_id, event in (events or {}).items():
+            self.add(event_id, event)
+
+    def add(self, event_id, event):
+        with self.lock:
+            if event_id in self.events:
+                self.remove(event_id)
+
+            key = (start_timestamp(event), event_id)
+            self.events[event_id] = event
+            self.keys[event_id] = key
+            insort(self.order, key)
+            if event.tag:
+                insort(self.by_tag.setdefault(event.tag, []), key)
+            self.search_index.add(event_id, event)
+
+    def remove(self, event_id):
+        with self.lock:
+            event = self.events.pop(event_id, None)
+            if event is None:
+                return
+            key = self.keys.pop(event_id)
+            self.order.pop(bisect_left(self.order, key))
+
+            tag = event.tag
+            if tag:
+                tag_keys = self.by_tag[tag]
+                tag_keys.pop(bisect_left(tag_keys, key))
+                if not tag_keys:
+                    del self.by_tag[tag]
+            self.search_index.remove(event_id)
+
+    def tags(self):
+        with self.lock:
+            return sorted(self.by_tag)
+
+    def query(self, start=None, end=None, tag=None, text=None, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """Returns (events, next_cursor) for events starting in [start, end), optionally with one tag and some text.
+        Events with no start time are only included when there is no end."""
+        with self.lock:
+            keys = self.order if tag is None else self.by_tag.get(tag, [])
+
+            # Text searches narrow the keys down to the matching events, still in time order
+            if text:
+                matches = [self.keys[event_id] for event_id in self.search_index.search(text)]
+                keys = sorted(key for key in matches if tag is None or self.events[key[1]].tag == tag)
+
+            # Find the slice of keys in the time range
+            low = 0 if start is None else bisect_left(keys, (start,))
+            high = len(keys) if end is None else bisect_left(keys, (end,))
+            if cursor:
+                low = max(low, bisect_right(keys, decode_cursor(cursor)))
+
+            page = [self.event_json(key[1]) for key in keys[low:min(high, low + limit)]]
+            next_cursor = encode_cursor(keys[low + limit - 1]) if low + limit < high else None
+            return page, next_cursor
+
+    def search(self, text, limit=DEFAULT_PAGE_SIZE):
+        """Returns the events best matching text, best match first"""
+        with self.lock:
+            return [self.event_json(event_id) for event_id in self.search_index.search(text, limit)]
+
+    def event_json(self, event_id):
+        return dict(self.events[event_id].to_dict(), id=event_id)
+
+    def __len__(self):
+        return len(self.events)
+#-----------------------STORE-----------------------#
+class EventStore:
+    """Keeps an EventIndex of the published catalog, re-downloading it every EVENTS_REFRESH_SECONDS.
+    After the first load only the events that were added, changed or removed are applied to the index.
+    The whole catalog and its tags are also kept as Payloads, rebuilt only when the catalog changes"""
+
+    def __init__(self, source_url=EVENTS_SOURCE_URL, refresh_seconds=EVENTS_REFRESH_SECONDS):
+        self.source_url = source_url
+        self.refresh_seconds = refresh_seconds
+        self.index = None
+        self.manifest = {}      # id -> hash of every event in the index
+        self.payloads = {}      # "catalog"/"tags" -> Payload of the current index
+        self.loaded_at = 0
+        self.lock = threading.Lock()
+
+    def fetch_events(self):
+        import requests  # Only needed once the first request asks for events
+
+        return catalog_dict(requests.get(self.source_url, timeout=30).json())
+
+    def refresh(self):
+        events = self.fetch_events()
+        if self.index is None:
+            index = EventIndex({event_id: Event.from_dict(event) for event_id, event in events.items()})
+            self.payloads = self.build_payloads(index)
+            self.index = index
+        else:
+            added, changed, removed = diff_events(self.manifest, events)
+            for event_id in removed:
+                self.index.remove(event_id)
+            for event_id in added + changed:
+                self.index.add(event_id, Event.from_dict(events[event_id]))
+            if added or changed or removed:
+                self.payloads = self.build_payloads(self.index)
+
+        # Hashed from the downloaded JSON, so the manifest matches what publish wrote
+        self.manifest = {event_id: event_hash(event) for event_id, event in events.items()}
+        self.loaded_at = time.time()
+
+    def build_payloads(self, index):
+        # Serialized and compressed once per catalog change instead of once per request
+        events, _ = index.query(limit=max(len(index), 1))
+        return {
+            "catalog": Payload.from_data({"events": events}),
+            "tags": Payload.from_data({"tags": index.tags()}),
+        }
+
+    def get_payload(self, name):
+        self.get_index()
+        return self.payloads[name]
+
+    def get_index(self):
+        # Only one request re-downloads, the rest keep using the current index until it's ready
+        if self.index is None or time.time() - self.loaded_at > self.refresh_seconds:
+            if self.lock.acquire(blocking=self.index is None):
+                try:
+                    if self.index is None or time.time() - self.loaded_at > self.refresh_seconds:
+                        self.refresh()
+                finally:
+                    self.lock.release()
+        return self.index
@@ -0,0 +1,3 @@
+"""Event types shared by the scrapers, the email parser and the Flask app"""
+from .event_model import Event, CENTRAL_TIME, EMAIL_TAG
+from .manifest import catalog_dict, event_hash, diff_events
@@ -0,0 +1,107 @@
+#-----------------------IMPORTS & VARIABLES-----------------------#
+# Imports
+from dataclasses import dataclass
+from datetime import datetime
+from zoneinfo import ZoneInfo
+import re
+
+# Variables & Constants
+CENTRAL_TIME = ZoneInfo("America/Chicago")     # Every event we list is in Champaign
+EMAIL_TAG = "Email Import"
+
+# (attribute, JSON key) of every field
+FIELDS = (
+    ("summary", "summary"),
+    ("description", "description"),
+    ("html_link", "htmlLink"),
+    ("start", "start"),
+    ("end", "end"),
+    ("location", "location"),
+    ("tag", "tag"),
+)
+
+# Parsed email events, "YYYY-MM-DD" and "HH:MM" or "H:MM AM/PM"
+EMAIL_DATE_PATTERN = re.compile(r"^\s*(\d{4})-(\d{1,2})-(\d{1,2})\s*$")
+EMAIL_TIME_PATTERN = re.compile(r"^\s*(\d{1,2}):(\d{2})\s*([AaPp][Mm])?\s*$")
+#-----------------------HELPER FUNCTIONS-----------------------#
+def email_datetime(date_text, time_text):
+    """Turns a parsed email's "YYYY-MM-DD" and "HH:MM"/"H:MM AM/PM" into an ISO string in Central Time.
+    Raises ValueError if either can't be read"""
+    date_match = EMAIL_DATE_PATTERN.match(date_text or "")
+    time_match = EMAIL_TIME_PATTERN.match(time_text or "")
+    if date_match is None or time_match is None:
+        raise ValueError(f"Unreadable date/time: {date_text!r} {time_text!r}")
+
+    hour = int(time_match.group(1))
+    if meridiem := time_match.group(3):
+        if hour > 12:
+            raise ValueError(f"Unreadable time: {time_text!r}")
+        hour = hour % 12 + (12 if meridiem.lower() == "pm" else 0)
+    year, month, day = (int(part) for part in date_match.groups())
+    return datetime(year, month, day, hour, int(time_match.group(2)), tzinfo=CENTRAL_TIME).isoformat()
+
+def now_iso():
+    return datetime.now(CENTRAL_TIME).replace(microsecond=0).isoformat()
+#-----------------------EVENT-----------------------#
+@dataclass(slots=True)
+class Event:
+    """One event, from a scraper or a parsed email.
+
+    Times are ISO 8601 strings with a UTC offset. None means the source had no
+    value for that field, and it is left out of to_dict so the published JSON
+    keeps the exact shape every scraper has always written.
+    """
+
+    summary: str = ""
+    description: str = ""
+    html_link: str | None = None
+    start: str | None = None
+    end: str | None = None
+    location: str | None = None
+    tag: str | None = None
+
+    @classmethod
+    def from_dict(cls, data):
+        """Builds an event from its JSON form (summary/start/end/htmlLink/...), ignoring unknown keys"""
+        return cls(**{attribute: data[key] for attribute, key in FIELDS if key in data})
+
+    @classmethod
+    def from_email(cls, data, tag=EMAIL_TAG, start_time="12:00", end_time="23:59", strict=False):
+        """Builds an event from one of parse_email_content's events (title/start_date/start_time/...).
+        Missing times default to start_time and end_time. Unreadable dates fall back to now, or raise ValueError if strict"""
+        start_date = data.get("start_date")
+        end_date = data.get("end_date") or start_date
+        try:
+            start = email_datetime(start_date, data.get("start_time") or start_time)
+        except ValueError as e:
+            if strict:
+                raise
+            print(f"Error parsing start date/time: {e}")
+            start = now_iso()
+        try:
+            end = email_datetime(end_date, data.get("end_time") or end_time)
+        except ValueError as e:
+            if strict:
+                raise
+            print(f"Error parsing end date/time: {e}")
+            end = now_iso()
+
+        return cls(
+            summary=data.get("title") or "Untitled Event",
+            description=data.get("description") or "",
+            start=start,
+            end=end,
+            location=data.get("location") or "",
+            tag=tag,
+        )
+
+    def strip(self):
+        """Trims whitespace around every text field, returns the event"""
+        for attribute, _ in FIELDS:
+            value = getattr(self, attribute)
+            if isinstance(value, str):
+                setattr(self, attribute, value.strip())
+        return self
+
+    def to_dict(self):
+        return {key: value for attribute, key in FIELDS if (value := getattr(self, attribute)) is not None}
@@ -0,0 +1,27 @@
+#-----------------------IMPORTS & VARIABLES-----------------------#
+# Imports
+import hashlib
+import json
+#-----------------------CATALOGS-----------------------#
+def catalog_dict(snapshot):
+    """Turns a published catalog read from Firebase into {event id: event}.
+    Sequential integer keys come back from Firebase as a list, with None for missing ids"""
+    if isinstance(snapshot, list):
+        return {str(i): event for i, event in enumerate(snapshot) if event is not None}
+    return snapshot or {}
+#-----------------------MANIFESTS-----------------------#
+# A manifest is {event id: event_hash} of a published catalog, the scraper and the app both diff against one
+def event_hash(event_info):
+    """Hash of everything in an event, used to tell if it changed since the last publish"""
+    return hashlib.sha1(json.dumps(event_info, sort_keys=True).encode("utf-8")).hexdigest()
+
+def diff_events(previous_manifest, events):
+    """Splits events into the ids that were added, changed and removed since previous_manifest"""
+    added, changed = [], []
+    for event_id, event_info in events.items():
+        if event_id not in previous_manifest:
+            added.append(event_id)
+        elif previous_manifest[event_id] != event_hash(event_info):
+            changed.append(event_id)
+    removed = [event_id for event_id in previous_manifest if event_id not in events]
+    return added, changed, removed
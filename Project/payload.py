@@ -0,0 +1,97 @@
+#-----------------------IMPORTS & VARIABLES-----------------------#
+# Imports
+import gzip
+import hashlib
+import json
+import os
+
+# brotli is optional (pip install brotli), without it browsers are sent gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Variables & Constants
+MIN_COMPRESS_BYTES = int(os.getenv("MIN_COMPRESS_BYTES", 1024))    # Smaller bodies are sent as they are, compressing them saves next to nothing
+CACHE_CONTROL = "no-cache"      # Browsers keep the response but check its ETag with the server before using it again
+ENCODINGS = ["br", "gzip"] if brotli else ["gzip"]     # Best first
+#-----------------------HELPER FUNCTIONS-----------------------#
+def compress(body, encoding, fast=False):
+    """Compresses body with encoding. fast is for bodies built per request, the slow settings are for bodies built once"""
+    if encoding == "br":
+        return brotli.compress(body, quality=5 if fast else 11)
+    # mtime=0 so the same body always compresses to the same bytes
+    return gzip.compress(body, compresslevel=6 if fast else 9, mtime=0)
+
+def accepted_encodings(accept_encoding):
+    """Returns the content codings an Accept-Encoding header allows, ignoring ones with q=0"""
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        name, *params = part.split(";")
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name.strip() and quality > 0:
+            accepted.add(name.strip().lower())
+    return accepted
+
+def choose_encoding(accept_encoding, available=ENCODINGS):
+    """Picks the best encoding in available that the client accepts, or "identity" """
+    accepted = accepted_encodings(accept_encoding)
+    for encoding in available:
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return "identity"
+#-----------------------PAYLOAD-----------------------#
+class Payload:
+    """A JSON response body serialized, hashed and compressed once, then sent as is.
+
+    The ETag is a hash of the uncompressed body. Every encoding is different
+    bytes, so each gets its own strong ETag by appending the encoding's name,
+    and If-None-Match only compares the hash, so a browser holding the gzip
+    copy still gets a 304 when it asks for brotli.
+    """
+
+    def __init__(self, body, encodings=ENCODINGS, fast=False):
+        self.body = body
+        self.digest = hashlib.sha256(body).hexdigest()[:32]
+        self.encoded = {"identity": body}
+        if len(body) >= MIN_COMPRESS_BYTES:
+            for encoding in encodings:
+                self.encoded[encoding] = compress(body, encoding, fast)
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(json.dumps(data, separators=(",", ":"), sort_keys=True).encode("utf-8"))
+
+    def encoding_for(self, accept_encoding):
+        return choose_encoding(accept_encoding, [encoding for encoding in ENCODINGS if encoding in self.encoded])
+
+    def etag(self, encoding="identity"):
+        suffix = "" if encoding == "identity" else f"-{encoding}"
+        return f'"{self.digest}{suffix}"'
+
+    def matches(self, if_none_match):
+        """Whether an If-None-Match header names this body, in any encoding"""
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*":
+                return True
+            # If-None-Match uses the weak comparison, W/ is ignored
+            tag = tag.removeprefix("W/").strip('"')
+            if tag.split("-", 1)[0] == self.digest:
+                return True
+        return False
+
+    def headers(self, encoding):
+        headers = {"ETag": self.etag(encoding), "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding"}
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return headers
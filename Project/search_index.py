@@ -0,0 +1,94 @@
+#-----------------------IMPORTS & VARIABLES-----------------------#
+# Imports
+from bisect import bisect_left, insort
+import math
+import re
+
+# Variables & Constants
+FIELD_WEIGHTS = {"summary": 3.0, "location": 2.0, "description": 1.0}  # A title match counts more than a description match
+PREFIX_WEIGHT = 0.5     # A word that only starts with the query term counts half as much as an exact word
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+#-----------------------HELPER FUNCTIONS-----------------------#
+def tokenize(text):
+    return TOKEN_PATTERN.findall((text or "").lower())
+#-----------------------INDEX-----------------------#
+class SearchIndex:
+    """Inverted index over event text with prefix matching.
+
+    ``postings`` maps each word to the events containing it and a weight for
+    how many times, and in which fields, it appears. ``vocabulary`` is every
+    word in sorted order, so all words starting with a prefix are one bisect
+    away. Events are added and removed one at a time, so the index can follow
+    the catalog as individual events change.
+    """
+
+    def __init__(self):
+        self.postings = {}      # word -> {event id: weight}
+        self.event_words = {}   # event id -> words indexed for it, used to remove it again
+        self.vocabulary = []    # every word, sorted
+
+    def add(self, event_id, event):
+        if event_id in self.event_words:
+            self.remove(event_id)
+
+        # Weight each word by the fields it appears in
+        weights = {}
+        for field, field_weight in FIELD_WEIGHTS.items():
+            for word in tokenize(getattr(event, field)):
+                weights[word] = weights.get(word, 0) + field_weight
+
+        for word, weight in weights.items():
+            if word not in self.postings:
+                self.postings[word] = {}
+                insort(self.vocabulary, word)
+            self.postings[word][event_id] = weight
+        self.event_words[event_id] = list(weights)
+
+    def remove(self, event_id):
+        for word in self.event_words.pop(event_id, []):
+            postings = self.postings[word]
+            del postings[event_id]
+            if not postings:
+                del self.postings[word]
+                self.vocabulary.pop(bisect_left(self.vocabulary, word))
+
+    def expand(self, term):
+        """Returns every indexed word starting with term"""
+        words = []
+        for i in range(bisect_left(self.vocabulary, term), len(self.vocabulary)):
+            if not self.vocabulary[i].startswith(term):
+                break
+            words.append(self.vocabulary[i])
+        return words
+
+    def search(self, query, limit=None):
+        """Returns the ids of events matching every word of the query, best match first"""
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        total_events = len(self.event_words)
+        scores = None
+        for term in terms:
+            # Score every event containing a word that starts with this term
+            term_scores = {}
+            for word in self.expand(term):
+                postings = self.postings[word]
+                idf = math.log(1 + total_events / len(postings))
+                boost = 1.0 if word == term else PREFIX_WEIGHT
+                for event_id, weight in postings.items():
+                    term_scores[event_id] = term_scores.get(event_id, 0) + weight * idf * boost
+
+            # Events have to match every term
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {event_id: score + term_scores[event_id] for event_id, score in scores.items() if event_id in term_scores}
+            if not scores:
+                return []
+
+        ranked = sorted(scores, key=lambda event_id: (-scores[event_id], event_id))
+        return ranked if limit is None else ranked[:limit]
+
+    def __len__(self):
+        return len(self.event_words)
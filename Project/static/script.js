@@ -387,11 +387,12 @@ function removeToast(toast) {
 // Handle processing emails
 async function handleProcessEmails() {
   const amount = document.getElementById("email-amount").value;
+  const sync = document.getElementById("email-sync").checked;
   const processBtn = document.getElementById("process-emails-btn");
   const originalText = processBtn.textContent;
 
-  // Validate amount
-  if (!amount || amount < 1 || amount > 25) {
+  // Validate amount, a sync ignores it
+  if (!sync && (!amount || amount < 1 || amount > 25)) {
     showToast("Invalid Amount", "Please enter a number between 1 and 25", "warning");
     return;
   }
@@ -401,7 +402,8 @@ async function handleProcessEmails() {
 
   showToast(
     "Processing...",
-    `Fetching and analyzing ${amount} emails. This may take a minute.`,
+    sync ? "Fetching and analyzing new emails. This may take a minute."
+         : `Fetching and analyzing ${amount} emails. This may take a minute.`,
     "info",
     0  // Don't auto-dismiss while processing
   );
@@ -419,7 +421,7 @@ async function handleProcessEmails() {
     let emailsProcessed = 0;
 
     // Use EventSource for real-time streaming
-    const eventSource = new EventSource(`/api/process_emails_stream?amount=${amount}`);
+    const eventSource = new EventSource(`/api/process_emails_stream?amount=${amount}&sync=${sync ? 1 : 0}`);
 
     eventSource.onmessage = function(event) {
       const data = JSON.parse(event.data);
@@ -436,7 +438,7 @@ async function handleProcessEmails() {
         const toastContainer = document.getElementById('toast-container');
         const processingToast = toastContainer.querySelector('.toast.info .toast-message');
         if (processingToast) {
-          processingToast.textContent = `Analyzing email ${data.current} of ${data.total}...`;
+          processingToast.textContent = `Analyzed ${data.current} of ${data.total} emails...`;
         }
       } else if (data.type === 'event') {
         // Parse event data to convert ISO times to 12-hour format
@@ -504,7 +506,11 @@ async function handleProcessEmails() {
 
     eventSource.onerror = function(error) {
       console.error("EventSource error:", error);
-      eventSource.close();
+
+      // While the browser is reconnecting it resumes the job from the Last-Event-ID it saw, keep waiting
+      if (eventSource.readyState !== EventSource.CLOSED) {
+        return;
+      }
 
       // Clear processing toast
       const toastContainer = document.getElementById('toast-container');
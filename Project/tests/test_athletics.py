@@ -0,0 +1,54 @@
+import json
+from datetime import datetime
+
+from web_scraper import scrape
+
+SCHEDULE = (
+    '<html><body><div class="sidearm-schedule-title"><h2>2025-26 Men\'s Basketball Schedule</h2></div><ul>'
+    '<li class="sidearm-schedule-game sidearm-schedule-home-game">'
+    '<div class="sidearm-schedule-game-opponent-date"><span>Nov 5 (Wed)</span><span>7 pm</span></div>'
+    '<div class="sidearm-schedule-game-opponent-name"><a>Duke</a></div>'
+    '<div class="sidearm-schedule-game-location"><span>Champaign, Ill.</span><span>State Farm Center</span></div></li>'
+    '<li class="sidearm-schedule-game sidearm-schedule-home-game">'
+    '<div class="sidearm-schedule-game-opponent-date"><span>Feb 10 (Tue)</span><span>8 pm</span></div>'
+    '<div class="sidearm-schedule-game-opponent-name"><a>Purdue</a></div>'
+    '<div class="sidearm-schedule-game-location"><span>Champaign, Ill.</span><span>State Farm Center</span></div></li>'
+    '</ul></body></html>'
+)
+LINK = "https://fightingillini.com/sports/mens-basketball/schedule"
+
+
+def test_cached_listing_does_not_hold_a_year():
+    games = scrape.parse_athletics_listing(SCHEDULE, LINK)
+    # What get_parsed stores, it goes through JSON in the page cache
+    assert json.loads(json.dumps(games)) == games
+    assert [(game["date_text"], game["time_text"]) for game in games] == [("Nov 5 (Wed)", "7 pm"), ("Feb 10 (Tue)", "8 pm")]
+
+
+def test_year_comes_from_the_season():
+    games = scrape.parse_athletics_listing(SCHEDULE, LINK)
+    assert [game["season"] for game in games] == ["2025-26", "2025-26"]
+    # The same cached listing gives the same dates before and after New Year
+    for today in (datetime(2025, 9, 1), datetime(2025, 12, 31), datetime(2026, 1, 2), datetime(2026, 7, 1)):
+        events = scrape.athletics_events(games, today)
+        assert [event.start for event in events] == ["2025-11-05T19:00:00-06:00", "2026-02-10T20:00:00-06:00"]
+
+
+def test_single_year_season():
+    schedule = SCHEDULE.replace("2025-26 Men's Basketball", "2026 Baseball")
+    events = scrape.parse_athletics_schedule(schedule, LINK, datetime(2025, 12, 1))
+    assert [event.start for event in events] == ["2026-11-05T19:00:00-06:00", "2026-02-10T20:00:00-06:00"]
+
+
+def test_year_without_a_season_is_nearest_today():
+    schedule = SCHEDULE.replace("2025-26 Men's Basketball Schedule", "Men's Basketball Schedule")
+    events = scrape.parse_athletics_schedule(schedule, LINK, datetime(2026, 1, 2))
+    assert [event.start for event in events] == ["2025-11-05T19:00:00-06:00", "2026-02-10T20:00:00-06:00"]
+
+
+def test_schedule_events():
+    events = scrape.parse_athletics_schedule(SCHEDULE, LINK, datetime(2025, 9, 1))
+    assert events[0].summary == "Men's Basketball Game: Illinois VS. Duke"
+    assert events[0].location == "State Farm Center, Champaign, Ill."
+    assert events[0].tag == "Athletics"
+    assert events[0].end == "2025-11-05T22:00:00-06:00"
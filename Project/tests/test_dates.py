@@ -0,0 +1,14 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from web_scraper.dates import parse_general_date
+
+CORPUS_PATH = Path(__file__).resolve().parent.parent / "benchmarks" / "date_corpus.json"
+CORPUS = json.loads(CORPUS_PATH.read_text(encoding="utf-8"))
+
+
+@pytest.mark.parametrize("date_string, start, end", CORPUS)
+def test_general_date_corpus(date_string, start, end):
+    assert parse_general_date(date_string) == (start, end)
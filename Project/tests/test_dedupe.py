@@ -0,0 +1,70 @@
+from eventflow import Event
+from web_scraper.dedupe import duplicate_groups, dedupe_events
+
+
+def event(summary, start, location="Siebel Center"):
+    return Event(summary=summary, start=start, location=location, tag="General")
+
+
+def test_relisted_event_is_merged():
+    events = {
+        "a": event("Fall Career Fair", "2025-09-10T10:00:00-05:00", "Illini Union"),
+        "b": Event(summary="The FALL CAREER FAIR!", start="2025-09-10T10:15:00-05:00", location="Illini Union", description="Bring a resume"),
+    }
+    deduped = dedupe_events(events)
+    assert list(deduped) == ["a"]
+    assert deduped["a"].description == "Bring a resume"
+
+
+def test_course_numbers_are_kept_apart():
+    events = [
+        event("CS 124 Office Hours", "2025-09-10T14:00:00-05:00", "Siebel Center Room 0216"),
+        event("CS 128 Office Hours", "2025-09-10T14:00:00-05:00", "Siebel Center Room 1404"),
+    ]
+    assert duplicate_groups(events) == []
+
+
+def test_room_numbers_are_kept_apart():
+    events = [
+        event("Python Workshop", "2025-09-10T14:00:00-05:00", "Siebel Center Room 0216"),
+        event("Python Workshop", "2025-09-10T14:00:00-05:00", "Siebel Center Room 1404"),
+    ]
+    assert duplicate_groups(events) == []
+
+
+def test_same_room_written_differently_is_merged():
+    events = [
+        event("Python Workshop", "2025-09-10T14:00:00-05:00", "Siebel Center Room 0216"),
+        event("Python Workshop!", "2025-09-10T14:15:00-05:00", "Room 216, Siebel Center"),
+    ]
+    assert duplicate_groups(events) == [[0, 1]]
+
+
+def test_numbered_sessions_are_kept_apart():
+    events = [
+        event("Yoga Session 1", "2025-09-10T09:00:00-05:00"),
+        event("Yoga Session 2", "2025-09-10T09:25:00-05:00"),
+        event("Yoga Session 3", "2025-09-10T09:50:00-05:00"),
+    ]
+    assert duplicate_groups(events) == []
+
+
+def test_matches_do_not_chain():
+    # Each start is within the tolerance of the next but not of the first
+    events = {
+        "a": event("Morning Yoga", "2025-09-10T09:00:00-05:00"),
+        "b": event("Morning Yoga", "2025-09-10T09:25:00-05:00"),
+        "c": event("Morning Yoga", "2025-09-10T09:50:00-05:00"),
+        "d": event("Morning Yoga", "2025-09-10T10:15:00-05:00"),
+        "e": event("Morning Yoga", "2025-09-10T10:40:00-05:00"),
+    }
+    assert list(dedupe_events(events)) == ["a", "c", "e"]
+
+
+def test_events_without_a_start_are_not_merged():
+    events = [
+        event("Mystery Lecture", ""),
+        event("Mystery Lecture", ""),
+        event("Mystery Lecture", None),
+    ]
+    assert duplicate_groups(events) == []
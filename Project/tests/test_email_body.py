@@ -0,0 +1,107 @@
+from email_parser.email_body import slim_body
+
+GMAIL_FORWARD = (
+    '<div dir="ltr">FYI, see below<br><br>'
+    '<div class="gmail_quote gmail_quote_container">'
+    '<div dir="ltr" class="gmail_attr">---------- Forwarded message ---------<br>'
+    'From: <strong class="gmail_sendername" dir="auto">ACM UIUC</strong> '
+    '<span dir="auto">&lt;<a href="mailto:acm@illinois.edu">acm@illinois.edu</a>&gt;</span><br>'
+    'Date: Mon, Nov 3, 2025 at 9:12 AM<br>Subject: HackIllinois 2025<br>'
+    'To: &lt;<a href="mailto:cs-students@lists.illinois.edu">cs-students@lists.illinois.edu</a>&gt;<br></div><br><br>'
+    '<div dir="ltr"><p>Join us for HackIllinois on Nov 8 at 10:00 am in Siebel Center.</p></div>'
+    '</div></div>'
+)
+
+GMAIL_REPLY = (
+    '<div dir="ltr">Sounds good, see you there.</div><br>'
+    '<div class="gmail_quote gmail_quote_container">'
+    '<div dir="ltr" class="gmail_attr">On Mon, Nov 3, 2025 at 9:12 AM Jane Doe &lt;'
+    '<a href="mailto:jane@illinois.edu">jane@illinois.edu</a>&gt; wrote:<br></div>'
+    '<blockquote class="gmail_quote" style="margin:0px 0px 0px 0.8ex;border-left:1px solid rgb(204,204,204);padding-left:1ex">'
+    '<div dir="ltr">Old planning meeting on Nov 4 at 3 pm</div></blockquote></div>'
+)
+
+OUTLOOK_MESSAGE = (
+    '<html><head><meta http-equiv="Content-Type" content="text/html; charset=utf-8">'
+    '<style type="text/css" style="display:none;"> P {margin-top:0;margin-bottom:0;} </style></head>'
+    '<body dir="ltr"><div class="elementToProof" style="font-family: Aptos, sans-serif; font-size: 12pt;">{note}</div>'
+    '<div id="appendonsend"></div><hr style="display:inline-block;width:98%" tabindex="-1">'
+    '<div id="divRplyFwdMsg" dir="ltr"><font face="Calibri, sans-serif" style="font-size:11pt" color="#000000">'
+    '<b>From:</b> Grainger Library &lt;library@illinois.edu&gt;<br><b>Sent:</b> Monday, November 3, 2025 9:12 AM<br>'
+    '<b>To:</b> Students &lt;students@illinois.edu&gt;<br><b>Subject:</b> Research Workshop</font><div>&nbsp;</div></div>'
+    '<div><p>Research Workshop on November 12 at 2:00 pm in Grainger Library Room 335.</p></div></body></html>'
+)
+
+OUTLOOK_PLAIN_FORWARD = (
+    "<pre>FYI\n\n-----Original Message-----\nFrom: Career Center &lt;careers@illinois.edu&gt;\n"
+    "Sent: Monday, November 3, 2025 9:12 AM\nTo: Students\nSubject: Fall Career Fair\n\n"
+    "The Fall Career Fair is November 5 from 10:00 am to 3:00 pm at the Illini Union.</pre>"
+)
+
+
+def test_gmail_forward_is_kept():
+    text, _, _ = slim_body(GMAIL_FORWARD, subject="Fwd: HackIllinois 2025")
+    assert text.startswith("FYI, see below")
+    assert "Join us for HackIllinois on Nov 8 at 10:00 am in Siebel Center." in text
+
+
+def test_gmail_forward_is_kept_without_a_subject():
+    text, _, _ = slim_body(GMAIL_FORWARD)
+    assert "Join us for HackIllinois on Nov 8" in text
+
+
+def test_gmail_reply_quote_is_dropped():
+    text, _, _ = slim_body(GMAIL_REPLY, subject="Re: Planning meeting")
+    assert text == "Sounds good, see you there."
+
+
+def test_outlook_forward_is_kept():
+    text, _, _ = slim_body(OUTLOOK_MESSAGE.replace("{note}", "FYI"), subject="FW: Research Workshop")
+    assert text.startswith("FYI")
+    assert "Research Workshop on November 12 at 2:00 pm in Grainger Library Room 335." in text
+
+
+def test_outlook_reply_quote_is_dropped():
+    text, _, _ = slim_body(OUTLOOK_MESSAGE.replace("{note}", "Thanks, I'll be there"), subject="RE: Research Workshop")
+    assert text == "Thanks, I'll be there"
+
+
+def test_outlook_plain_text_forward_is_kept():
+    text, _, _ = slim_body(OUTLOOK_PLAIN_FORWARD, subject="FW: Fall Career Fair")
+    assert "The Fall Career Fair is November 5 from 10:00 am to 3:00 pm at the Illini Union." in text
+
+
+def test_outlook_plain_text_reply_is_cut():
+    text, _, _ = slim_body(OUTLOOK_PLAIN_FORWARD, subject="RE: Fall Career Fair")
+    assert text == "FYI"
+
+
+def test_forward_after_signature_is_kept():
+    body = (
+        "<div>FYI</div><div>-- </div><div>Jane Doe</div>"
+        '<div class="gmail_quote"><div class="gmail_attr">---------- Forwarded message ---------<br>Subject: Talk</div>'
+        "<div>Guest talk on Nov 6 at 4 pm</div></div>"
+    )
+    text, _, _ = slim_body(body)
+    assert "Jane Doe" not in text
+    assert "Guest talk on Nov 6 at 4 pm" in text
+
+
+def test_underscore_rule_does_not_cut():
+    text, _, _ = slim_body("<div>Agenda</div><div>__________</div><div>Club meeting Nov 7 at 6 pm</div>")
+    assert "Club meeting Nov 7 at 6 pm" in text
+
+
+def test_event_line_that_looks_like_boilerplate_is_kept():
+    text, _, _ = slim_body("<p>Panel on data privacy policy in AI, Nov 5 at 5 pm in Siebel 2405</p>")
+    assert text == "Panel on data privacy policy in AI, Nov 5 at 5 pm in Siebel 2405"
+
+
+def test_event_line_after_signature_marker_is_kept():
+    text, _, _ = slim_body("<p>Weekly digest</p><p>--</p><p>Hackathon Nov 8 at 10 am</p>")
+    assert text == "Weekly digest\nHackathon Nov 8 at 10 am"
+
+
+def test_boilerplate_and_signature_without_dates_are_dropped():
+    text, _, _ = slim_body("<p>Club meeting Nov 7 at 6 pm</p><p>Unsubscribe from this list</p><p>--</p><p>Jane Doe</p>")
+    assert text == "Club meeting Nov 7 at 6 pm"
@@ -0,0 +1,94 @@
+import json
+import threading
+import time
+
+import pytest
+
+import app
+from email_parser import parse_email
+
+
+class FakeStream:
+    """Pages of emails, like EmailStream with a small page size"""
+
+    def __init__(self, pages=3, per_page=4, fail=False):
+        self.pages = pages
+        self.per_page = per_page
+        self.fail = fail
+        self.fetched = 0
+
+    def __iter__(self):
+        for page in range(self.pages):
+            emails = [f"Subject: page {page} email {i}\\n" + "word " * 2000 for i in range(self.per_page)]
+            self.fetched += len(emails)
+            yield emails
+        if self.fail:
+            raise RuntimeError("Graph went away")
+
+
+@pytest.fixture
+def model(monkeypatch):
+    """Stubs the model, recording how many requests were running at the same time"""
+    lock = threading.Lock()
+    state = {"running": 0, "most": 0}
+
+    def request_events_json(guidlines, contextual_content):
+        with lock:
+            state["running"] += 1
+            state["most"] = max(state["most"], state["running"])
+        time.sleep(0.2)
+        with lock:
+            state["running"] -= 1
+        return json.dumps({"events": []})
+
+    monkeypatch.setattr(parse_email, "request_events_json", request_events_json)
+    monkeypatch.setattr(parse_email, "llm_cache", None)
+    monkeypatch.setattr(parse_email, "USE_PREFILTER", False)
+    return state
+
+
+def test_pages_are_parsed_at_the_same_time(model):
+    results = list(app.parse_email_stream(FakeStream()))
+
+    assert sorted(index for index, _ in results) == list(range(12))
+    # Two emails fit in a batch, so each page is two batches, more than that running means pages overlapped
+    assert model["most"] > 2
+
+
+def test_fetch_error_is_raised(model):
+    with pytest.raises(RuntimeError):
+        list(app.parse_email_stream(FakeStream(fail=True)))
+
+
+def test_closing_early_stops_the_fetch_thread(model, monkeypatch):
+    monkeypatch.setattr(app, "FETCH_QUEUE_PAGES", 1)
+    stream = FakeStream(pages=10, per_page=1)
+    parsed = app.parse_email_stream(stream)
+    next(parsed)
+    parsed.close()
+
+    time.sleep(1.5)
+    assert stream.fetched < 10
+
+
+def test_process_emails_keeps_email_order(monkeypatch):
+    def request_events_json(guidlines, contextual_content):
+        # Earlier pages answer last
+        ids = [line.split()[2] for line in contextual_content.splitlines() if line.startswith("=== EMAIL")]
+        time.sleep(0.3 - 0.1 * (int(ids[0]) // 4))
+        return json.dumps({"events": [{
+            "email_id": email_id, "title": f"Event {email_id}", "start_date": "2025-11-08", "end_date": "2025-11-08",
+            "start_time": "10:00", "end_time": "11:00", "location": "Siebel Center", "description": "",
+        } for email_id in ids]})
+
+    monkeypatch.setattr(parse_email, "request_events_json", request_events_json)
+    monkeypatch.setattr(parse_email, "llm_cache", None)
+    monkeypatch.setattr(parse_email, "USE_PREFILTER", False)
+    monkeypatch.setattr(app, "EmailStream", lambda *args, **kwargs: FakeStream())
+    monkeypatch.setattr(FakeStream, "finish", lambda self: None, raising=False)
+    monkeypatch.setattr(FakeStream, "login_error", None, raising=False)
+
+    response = app.app.test_client().post("/api/process_emails", json={"amount": 12})
+
+    assert response.status_code == 200
+    assert [event["summary"] for event in response.json["events"]] == [f"Event {i}" for i in range(12)]
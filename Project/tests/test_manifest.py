@@ -0,0 +1,13 @@
+from eventflow import catalog_dict, diff_events, event_hash
+
+
+def test_firebase_list_becomes_a_dict():
+    assert catalog_dict([None, {"summary": "a"}, None, {"summary": "b"}]) == {"1": {"summary": "a"}, "3": {"summary": "b"}}
+    assert catalog_dict({"abc": {"summary": "a"}}) == {"abc": {"summary": "a"}}
+    assert catalog_dict(None) == {}
+
+
+def test_diff_events():
+    previous = {"kept": event_hash({"summary": "a"}), "edited": event_hash({"summary": "b"}), "gone": event_hash({"summary": "c"})}
+    events = {"kept": {"summary": "a"}, "edited": {"summary": "B"}, "new": {"summary": "d"}}
+    assert diff_events(previous, events) == (["new"], ["edited"], ["gone"])
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from email_parser import parse_email
+
+
+class FakeCache:
+    def __init__(self):
+        self.stored = {}
+
+    def use_prompt(self, prompt):
+        pass
+
+    def get(self, key):
+        return self.stored.get(key)
+
+    def put(self, key, value):
+        self.stored[key] = value
+
+
+def event(title, email_id=None):
+    data = {
+        "title": title, "start_date": "2025-11-08", "end_date": "2025-11-08", "start_time": "10:00",
+        "end_time": "11:00", "location": "Siebel Center", "description": "",
+    }
+    if email_id is not None:
+        data["email_id"] = email_id
+    return data
+
+
+@pytest.fixture
+def model(monkeypatch):
+    """Stubs the model: batch requests get the queued batch answer, single emails get one event named after them"""
+    batch_answers = []
+    single_requests = []
+
+    def request_events_json(guidlines, contextual_content):
+        if "=== EMAIL" in contextual_content:
+            return json.dumps({"events": batch_answers.pop(0)})
+        email = contextual_content.rsplit("Email/Text to parse:\n", 1)[1]
+        single_requests.append(email)
+        return json.dumps({"events": [event(f"Single: {email}")]})
+
+    cache = FakeCache()
+    monkeypatch.setattr(parse_email, "request_events_json", request_events_json)
+    monkeypatch.setattr(parse_email, "llm_cache", cache)
+    return batch_answers, single_requests, cache
+
+
+def test_batch_events_are_split_by_email(model):
+    batch_answers, single_requests, cache = model
+    batch_answers.append([event("Hackathon", 0), event("Career Fair", 1)])
+
+    results = dict(parse_email.parse_batch([(0, "email zero"), (1, "email one")]))
+
+    assert [e["title"] for e in results[0]["events"]] == ["Hackathon"]
+    assert [e["title"] for e in results[1]["events"]] == ["Career Fair"]
+    assert single_requests == []
+    assert len(cache.stored) == 2
+
+
+@pytest.mark.parametrize("bad_event", [event("Mystery", 7), event("Mystery")])
+def test_unattributable_event_fails_the_whole_batch(model, bad_event):
+    batch_answers, single_requests, cache = model
+    batch_answers.append([event("Hackathon", 0), bad_event])
+
+    results = dict(parse_email.parse_batch([(0, "email zero"), (1, "email one")]))
+
+    # Every email is parsed again on its own, and only those answers are cached
+    assert sorted(single_requests) == ["email one", "email zero"]
+    assert [e["title"] for e in results[0]["events"]] == ["Single: email zero"]
+    assert [e["title"] for e in results[1]["events"]] == ["Single: email one"]
+    assert all(e["title"].startswith("Single: ") for parsed in cache.stored.values() for e in parsed["events"])
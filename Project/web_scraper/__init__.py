@@ -0,0 +1 @@
+"""Scrapes the campus calendars and publishes their events. Run from the Project directory: python -m web_scraper.scrape"""
@@ -0,0 +1,61 @@
+#-----------------------IMPORTS & VARIABLES-----------------------#
+# Imports
+from urllib.parse import urlsplit
+import asyncio
+
+# Variables & Constants
+DEFAULT_POOL_SIZE = 4                                   # Pages rendering at the same time
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}     # Never needed to read the event details
+USER_AGENT = "Mozilla/5.0"
+#-----------------------HELPER FUNCTIONS-----------------------#
+def site_of(url):
+    """Returns the last two labels of a url's host, e.g. www.statefarmcenter.com -> statefarmcenter.com"""
+    host = urlsplit(url).hostname or ""
+    return ".".join(host.split(".")[-2:])
+
+def make_resource_blocker(first_party_sites):
+    """Builds a route handler that aborts images, media, fonts and scripts from other sites"""
+    async def block_resources(route):
+        request = route.request
+        if request.resource_type in BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        elif request.resource_type == "script" and site_of(request.url) not in first_party_sites:
+            await route.abort()
+        else:
+            await route.continue_()
+    return block_resources
+#-----------------------PAGE POOL-----------------------#
+async def render_pages_async(urls, pool_size=DEFAULT_POOL_SIZE):
+    # Playwright is only imported when a page actually needs a browser, most runs never do
+    from playwright.async_api import async_playwright
+
+    # One browser and context for every page, so first-party scripts and styles are cached between events
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        context = await browser.new_context(user_agent=USER_AGENT)
+        await context.route("**/*", make_resource_blocker({site_of(url) for url in urls}))
+
+        # Pool of open pages, each one is borrowed for a single event at a time
+        pages = asyncio.Queue()
+        for _ in range(min(pool_size, len(urls))):
+            pages.put_nowait(await context.new_page())
+
+        async def render(url):
+            page = await pages.get()
+            try:
+                await page.goto(url, wait_until="domcontentloaded")
+                return await page.content()
+            finally:
+                pages.put_nowait(page)
+
+        try:
+            return await asyncio.gather(*[render(url) for url in urls])
+        finally:
+            # Close the browser
+            await browser.close()
+
+def render_pages(urls, pool_size=DEFAULT_POOL_SIZE):
+    """Loads every url in a headless browser, pool_size at a time, returning the page html in input order"""
+    if not urls:
+        return []
+    return asyncio.run(render_pages_async(urls, pool_size))
@@ -0,0 +1,186 @@
+#-----------------------IMPORTS & VARIABLES-----------------------#
+# Imports
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+import re
+
+# Variables & Constants
+CENTRAL_TIME = ZoneInfo("America/Chicago")     # Every event we scrape is in Champaign
+
+# Month names and abbreviations, lowercased
+MONTHS = {}
+for number, name in enumerate(["january", "february", "march", "april", "may", "june", "july",
+                               "august", "september", "october", "november", "december"], start=1):
+    MONTHS[name] = number
+    MONTHS[name[:3]] = number
+MONTHS["sept"] = 9
+
+# Athletics schedules leave out the year, games in these months belong to the second half of the season
+NEXT_YEAR_MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul"]
+# The season in a schedule's title, "2025-26" for a season over New Year or "2026"
+SEASON_PATTERN = re.compile(r"(\d{4})(?:-(\d{2,4}))?")
+
+# "Month Day, Year", the first one is the start date
+DATE_PATTERN = re.compile(r"(\w+)\s+(\d{1,2}),\s+(\d{4})")
+# "Month Day" with no year
+MONTH_DAY_PATTERN = re.compile(r"(\w+)\s+(\d+)")
+# "H:MM - H:MM am/pm" or "H:MM am - H:MM pm"
+TIME_RANGE_PATTERN = re.compile(r"(\d{1,2}):(\d{2})\s*(am|pm)?\s*-\s*(\d{1,2}):(\d{2})\s*(am|pm)", re.IGNORECASE)
+# "H:MM am/pm"
+TIME_PATTERN = re.compile(r"(\d{1,2}):(\d{2})\s*(am|pm)", re.IGNORECASE)
+# "H:MM am/pm" or "H am/pm"
+LOOSE_TIME_PATTERN = re.compile(r"(\d{1,2}):?(\d{2})?\s*(am|pm)", re.IGNORECASE)
+NON_DIGITS = re.compile(r"\D")
+#-----------------------HELPER FUNCTIONS-----------------------#
+def month_number(month_str):
+    """Turns a month name or abbreviation into its number, raising ValueError if it isn't one"""
+    try:
+        return MONTHS[month_str.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown month: {month_str}")
+
+def to_24_hour(hour, meridiem):
+    meridiem = meridiem.lower()
+    if meridiem == "pm" and hour != 12:
+        return hour + 12
+    elif meridiem == "am" and hour == 12:
+        return 0
+    return hour
+
+def central_day(date_match):
+    """Midnight Central time on a DATE_PATTERN match's date"""
+    return datetime(int(date_match.group(3)), month_number(date_match.group(1)), int(date_match.group(2)), tzinfo=CENTRAL_TIME)
+
+def at_time(day, hour, minute):
+    return day.replace(hour=hour, minute=minute)
+#-----------------------PARSERS-----------------------#
+def parse_general_date(date_string):
+    """Parses a calendars.illinois.edu date, e.g. "November 5, 2025 6:30 - 8:00 pm", into (start, end) ISO strings.
+    Times default to 2 hours long, or all day with no time. Returns ("", "") for anything it can't read"""
+    try:
+        # Parse dates - "Month Day, Year" or "Month Day, Year - Month Day, Year"
+        date_matches = list(DATE_PATTERN.finditer(date_string))
+        if not date_matches:
+            return "", ""
+        start_day = central_day(date_matches[0])
+        end_day = central_day(date_matches[-1])
+
+        # Parse times - handle formats like "6:30 - 8:00 am" or "6:30 am - 8:00 pm"
+        if time_range_match := TIME_RANGE_PATTERN.search(date_string):
+            start_meridiem = time_range_match.group(3)
+            end_meridiem = time_range_match.group(6)
+            start_hour = int(time_range_match.group(1))
+            start_minute = int(time_range_match.group(2))
+            end_hour = to_24_hour(int(time_range_match.group(4)), end_meridiem)
+            end_minute = int(time_range_match.group(5))
+
+            # If start time doesn't have am/pm, use the end time's am/pm, unless that puts the start after the end,
+            # "11:30 - 1:00 pm" starts in the morning
+            start_24 = to_24_hour(start_hour, start_meridiem or end_meridiem)
+            if not start_meridiem and (start_24, start_minute) > (end_hour, end_minute):
+                start_24 = to_24_hour(start_hour, "am" if end_meridiem.lower() == "pm" else "pm")
+            start = at_time(start_day, start_24, start_minute)
+            end = at_time(end_day, end_hour, end_minute)
+        elif len(date_matches) > 1 and len(times := TIME_PATTERN.findall(date_string)) > 1:
+            # "Month Day, Year H:MM am - Month Day, Year H:MM pm", each date has its own time
+            start = at_time(start_day, to_24_hour(int(times[0][0]), times[0][2]), int(times[0][1]))
+            end = at_time(end_day, to_24_hour(int(times[-1][0]), times[-1][2]), int(times[-1][1]))
+        elif time_match := TIME_PATTERN.search(date_string):
+            # Single time only, default end time to 2 hours after start
+            start = at_time(start_day, to_24_hour(int(time_match.group(1)), time_match.group(3)), int(time_match.group(2)))
+            end = start + timedelta(hours=2)
+        else:
+            # No time found - all day event, through the last day of a date range
+            start = start_day
+            end = at_time(end_day, 23, 59)
+
+        # "10:00 pm - 1:00 am" ends the next day
+        if end < start:
+            end += timedelta(days=1)
+        return start.isoformat(), end.isoformat()
+    except Exception:
+        # If parsing fails, set empty dates
+        return "", ""
+
+def parse_state_farm_date(month_text, day_text, year_text, time_text):
+    """Parses the State Farm Center sidebar pieces, e.g. ("Dec", "5th", ", 2025", "7:30 PM"), into (start, end).
+    Shows default to 3 hours long"""
+    try:
+        time_match = TIME_PATTERN.search(time_text)
+        if time_match is None:
+            return "", ""
+
+        start_dt = datetime(
+            int(NON_DIGITS.sub("", year_text)),
+            month_number(month_text.strip()),
+            int(NON_DIGITS.sub("", day_text)),
+            to_24_hour(int(time_match.group(1)), time_match.group(3)),
+            int(time_match.group(2)),
+            tzinfo=CENTRAL_TIME
+        )
+        return start_dt.isoformat(), (start_dt + timedelta(hours=3)).isoformat()
+    except Exception:
+        return "", ""
+
+def athletics_year(month, day, today, season=""):
+    """The year of an athletics game. It comes from the schedule's season, "2025-26" puts Jan-Jul games in 2026.
+    Without a season it is the year that puts the game nearest today"""
+    if season_match := SEASON_PATTERN.search(season or ""):
+        year = int(season_match.group(1))
+        if season_match.group(2) and month[:3].title() in NEXT_YEAR_MONTHS:
+            year += 1
+        return year
+
+    def distance(year):
+        try:
+            return abs(datetime(year, month_number(month), day) - today.replace(tzinfo=None))
+        except ValueError:
+            # Feb 29 outside a leap year
+            return timedelta.max
+    return min([today.year - 1, today.year, today.year + 1], key=distance)
+
+def parse_athletics_date(date_text, time_text, today=None, season=""):
+    """Parses an athletics schedule date and time, e.g. ("Nov 5 (Wed)", "7 pm"), into (start, end).
+    Schedules leave out the year, see athletics_year. Games default to 3 hours long"""
+    try:
+        date_match = MONTH_DAY_PATTERN.search(date_text)
+        time_match = LOOSE_TIME_PATTERN.search(time_text)
+        if date_match is None or time_match is None:
+            return "", ""
+
+        month = date_match.group(1)
+        day = int(date_match.group(2))
+        start_dt = datetime(
+            athletics_year(month, day, today or datetime.now(), season),
+            month_number(month),
+            day,
+            to_24_hour(int(time_match.group(1)), time_match.group(3)),
+            int(time_match.group(2)) if time_match.group(2) else 0,
+            tzinfo=CENTRAL_TIME
+        )
+        return start_dt.isoformat(), (start_dt + timedelta(hours=3)).isoformat()
+    except Exception:
+        return "", ""
+#-----------------------BATCH PARSERS-----------------------#
+def parse_general_dates(date_strings):
+    """Parses many calendars.illinois.edu dates at once, returning (start, end) pairs in input order.
+    Calendars repeat the same date string a lot, so each distinct string is only parsed once"""
+    parsed = {}
+    results = []
+    for date_string in date_strings:
+        if date_string not in parsed:
+            parsed[date_string] = parse_general_date(date_string)
+        results.append(parsed[date_string])
+    return results
+
+def parse_athletics_dates(date_time_texts, today=None):
+    """Parses many (date text, time text, season) from athletics schedules at once, in input order"""
+    today = today or datetime.now()
+    parsed = {}
+    results = []
+    for date_time in date_time_texts:
+        if date_time not in parsed:
+            date_text, time_text, season = date_time
+            parsed[date_time] = parse_athletics_date(date_text, time_text, today, season)
+        results.append(parsed[date_time])
+    return results
@@ -0,0 +1,169 @@
+#-----------------------IMPORTS & VARIABLES-----------------------#
+# Imports
+from datetime import datetime
+import os
+import random
+import re
+import unicodedata
+import zlib
+
+# Variables & Constants
+TITLE_SIMILARITY = float(os.environ.get("DEDUPE_TITLE_SIMILARITY", 0.6))   # Share of title trigrams two events need in common to be the same event
+TIME_TOLERANCE_SECONDS = int(os.environ.get("DEDUPE_TIME_TOLERANCE", 30)) * 60   # Sources round start times differently
+
+# MinHash signatures of the title's words are split into bands, events sharing any band are compared.
+# 16 bands of 2 find titles sharing half their words 99% of the time and rarely pair titles sharing under a fifth
+MINHASH_BANDS = 16
+MINHASH_ROWS = 2
+# Each hash function is crc32 XORed with its own mask. Fixed seed, the same catalog always dedupes the same way
+minhash_random = random.Random(20240901)
+MINHASH_MASKS = [minhash_random.getrandbits(32) for _ in range(MINHASH_BANDS * MINHASH_ROWS)]
+
+# Words every source adds to titles, "Men's Basketball Game: Illinois VS. Duke" is "mens basketball duke"
+TITLE_STOPWORDS = {"a", "an", "the", "and", "of", "at", "in", "on", "vs", "v", "versus", "game", "illinois", "fighting", "illini"}
+# Too common in Champaign addresses to tell two places apart
+LOCATION_STOPWORDS = {"champaign", "urbana", "il", "ill", "illinois", "st", "street", "ave", "room", "hall", "center", "building", "s", "n", "e", "w"}
+NON_WORD = re.compile(r"[^a-z0-9]+")
+
+# Fields taken from a duplicate when the event that is kept has none
+FILL_FIELDS = ["description", "location", "tag", "end", "html_link"]
+#-----------------------HELPER FUNCTIONS-----------------------#
+def words(text, stopwords):
+    text = unicodedata.normalize("NFKD", (text or "").lower()).encode("ascii", "ignore").decode("ascii")
+    return [word for word in NON_WORD.sub(" ", text.replace("'", "")).split() if word not in stopwords]
+
+def trigrams(text):
+    """Character trigrams of a normalized title, what the final similarity check compares"""
+    if len(text) < 3:
+        return {text} if text else set()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def minhash(shingles):
+    """One minimum per hash function over the shingles, similar sets get mostly equal minimums.
+    Titles are hashed by word, a handful of hashes per event, trigrams would be ten times the work"""
+    hashes = [zlib.crc32(shingle.encode("utf-8")) for shingle in shingles]
+    return [min(map(mask.__xor__, hashes)) for mask in MINHASH_MASKS]
+
+def numbers(tokens):
+    """Number tokens, "Room 0216" and "Room 216" are the same room"""
+    return {token.lstrip("0") or "0" for token in tokens if token.isdigit()}
+
+def jaccard(first, second):
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+def start_timestamp(start):
+    try:
+        return datetime.fromisoformat(start).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+def find(parents, i):
+    while parents[i] != i:
+        parents[i] = parents[parents[i]]
+        i = parents[i]
+    return i
+#-----------------------DEDUPE-----------------------#
+class EventFingerprint:
+    """What dedupe compares about one event"""
+
+    __slots__ = ("exact_key", "day", "timestamp", "title_words", "title_numbers", "shingles", "places", "place_numbers")
+
+    def __init__(self, event):
+        title = words(event.summary, TITLE_STOPWORDS)
+        self.title_words = set(title)
+        self.title_numbers = numbers(title)
+        self.shingles = trigrams(" ".join(title))
+        self.places = set(words(event.location, LOCATION_STOPWORDS))
+        self.place_numbers = numbers(self.places)
+        self.exact_key = (" ".join(title), event.start or "", " ".join(sorted(self.places)))
+        self.timestamp = start_timestamp(event.start)
+        self.day = (event.start or "")[:10]
+
+    def same_event(self, other):
+        """Near-duplicate check for two events that landed in the same LSH bucket"""
+        if abs(self.timestamp - other.timestamp) > TIME_TOLERANCE_SECONDS:
+            return False
+        # Both sources name a place and they have nothing in common
+        if self.places and other.places and not self.places & other.places:
+            return False
+        # "CS 124 Office Hours" and "CS 128 Office Hours", or the same building and a different room
+        if self.title_numbers and other.title_numbers and self.title_numbers != other.title_numbers:
+            return False
+        if self.place_numbers and other.place_numbers and self.place_numbers != other.place_numbers:
+            return False
+        return jaccard(self.shingles, other.shingles) >= TITLE_SIMILARITY
+
+def duplicate_groups(events):
+    """Returns lists of indexes into events that are the same event, each list in the original order.
+    Exact matches are grouped by key, near matches through MinHash LSH buckets, so the work grows with
+    the number of events and not with the number of pairs"""
+    fingerprints = [EventFingerprint(event) for event in events]
+    parents = list(range(len(events)))
+
+    def union(i, j):
+        root_i, root_j = find(parents, i), find(parents, j)
+        if root_i != root_j:
+            # The earliest event is the root, it is the one that gets kept
+            parents[max(root_i, root_j)] = min(root_i, root_j)
+
+    # Same normalized title, start and place. Events without a start are never the same event
+    first_with_key = {}
+    for i, fingerprint in enumerate(fingerprints):
+        if not events[i].start:
+            continue
+        j = first_with_key.setdefault(fingerprint.exact_key, i)
+        if j != i:
+            union(j, i)
+
+    # Similar titles on the same day, only events with a start time can be compared
+    buckets = {}
+    for i, fingerprint in enumerate(fingerprints):
+        if fingerprint.timestamp is None or not fingerprint.title_words:
+            continue
+        signature = minhash(fingerprint.title_words)
+        for band in range(MINHASH_BANDS):
+            rows = tuple(signature[band * MINHASH_ROWS:(band + 1) * MINHASH_ROWS])
+            buckets.setdefault((fingerprint.day, band, rows), []).append(i)
+
+    # Groups are compared through their kept events, so 09:00 ~ 09:25 ~ 09:50 can't chain into one event
+    checked = set()
+    for bucket in buckets.values():
+        for position, i in enumerate(bucket):
+            for j in bucket[position + 1:]:
+                root_i, root_j = find(parents, i), find(parents, j)
+                if root_i == root_j or (root_i, root_j) in checked:
+                    continue
+                checked.add((root_i, root_j))
+                if fingerprints[root_i].same_event(fingerprints[root_j]):
+                    union(root_i, root_j)
+
+    groups = {}
+    for i in range(len(events)):
+        groups.setdefault(find(parents, i), []).append(i)
+    return [group for group in groups.values() if len(group) > 1]
+
+def merge(kept, duplicates):
+    """Fills in whatever the kept event is missing from its duplicates, returns the kept event"""
+    for field in FILL_FIELDS:
+        if not getattr(kept, field):
+            for duplicate in duplicates:
+                if value := getattr(duplicate, field):
+                    setattr(kept, field, value)
+                    break
+    return kept
+
+def dedupe_events(events):
+    """Merges events listed by more than one source or calendar. Takes and returns {id: Event}.
+    The first listing of an event keeps its id, the rest only fill in fields it is missing"""
+    event_ids = list(events)
+    event_list = [events[event_id] for event_id in event_ids]
+
+    removed = set()
+    for group in duplicate_groups(event_list):
+        merge(event_list[group[0]], [event_list[i] for i in group[1:]])
+        removed.update(event_ids[i] for i in group[1:])
+
+    print(f"Dedupe merged {len(removed)} duplicate events, {len(events) - len(removed)} left")
+    return {event_id: event for event_id, event in events.items() if event_id not in removed}
@@ -0,0 +1,92 @@
+#-----------------------IMPORTS & VARIABLES-----------------------#
+# Imports
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+# Variables & Constants
+DEFAULT_PER_HOST_LIMIT = 8      # Max requests in flight (and keep-alive connections) per host
+DEFAULT_MAX_WORKERS = 32        # Max threads shared by every host
+DEFAULT_TIMEOUT = 30            # Seconds before a single request gives up
+#-----------------------FETCHER-----------------------#
+class Fetcher:
+    """Downloads pages concurrently over a shared keep-alive session.
+
+    Every host gets its own connection pool of ``per_host_limit`` connections
+    and a semaphore of the same size, so one slow site can never be hit by
+    more than that many requests at once. ``per_host_limit=1`` gives the old
+    one-page-at-a-time behaviour. With an ``HttpCache`` attached, ``get_parsed``
+    sends conditional GETs and reuses the stored parse on a 304.
+    """
+
+    def __init__(self, per_host_limit=DEFAULT_PER_HOST_LIMIT, max_workers=DEFAULT_MAX_WORKERS, timeout=DEFAULT_TIMEOUT, cache=None):
+        self.per_host_limit = max(1, per_host_limit)
+        self.timeout = timeout
+        self.cache = cache
+        self.executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+
+        # One session for all threads, with a keep-alive pool sized to the per-host limit.
+        # pool_block makes extra threads wait for a free connection instead of opening new ones
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=self.per_host_limit, pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._host_limits = {}
+        self._host_limits_lock = threading.Lock()
+
+    def _host_limit(self, url):
+        host = urlsplit(url).netloc
+        with self._host_limits_lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_limits[host]
+
+    def request(self, url, headers=None):
+        """GET a url while holding its host's slot, returning the response"""
+        with self._host_limit(url):
+            return self.session.get(url, headers=headers, timeout=self.timeout)
+
+    def get(self, url):
+        """GET a url and return the page text"""
+        return self.request(url).text
+
+    def get_parsed(self, url, parse):
+        """GET a url and return parse(page text), skipping the download and parse if the cached copy is still current"""
+        if self.cache is None:
+            return parse(self.get(url))
+
+        # Ask the server whether our stored copy is still current
+        entry = self.cache.get(url)
+        response = self.request(url, headers=self.cache.conditional_headers(entry))
+        if response.status_code == 304 and entry is not None:
+            return entry["parsed"]
+
+        parsed = parse(response.text)
+
+        # Only pages that send validators can be revalidated later
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if response.ok and (etag or last_modified):
+            self.cache.put(url, etag, last_modified, parsed)
+        return parsed
+
+    def map(self, function, items):
+        """Run function over items on the pool, returning results in input order"""
+        return list(self.executor.map(function, items))
+
+    def get_many(self, urls):
+        """GET every url concurrently, returning the page texts in input order"""
+        return self.map(self.get, urls)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
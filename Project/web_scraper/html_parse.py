@@ -0,0 +1,37 @@
+#-----------------------IMPORTS-----------------------#
+# Imports
+from bs4 import BeautifulSoup, SoupStrainer
+#-----------------------HELPER FUNCTIONS-----------------------#
+def has_class(*class_names):
+    """Strainer test for elements with any of class_names.
+    While parsing, the class attribute can still be one unsplit string, so split it here"""
+    def matches(value):
+        if not value:
+            return False
+        values = value.split() if isinstance(value, str) else value
+        return any(name in class_names for name in values)
+    return matches
+#-----------------------SECTIONS-----------------------#
+# The only parts of each page the scrapers read, everything outside them is never built into the tree
+GENERAL_LISTING_SECTIONS = SoupStrainer("div", class_=has_class("title"))
+GENERAL_EVENT_SECTIONS = SoupStrainer("section", class_=has_class("detail-content"))
+ATHLETICS_SCHEDULE_SECTIONS = SoupStrainer(["div", "li"], class_=has_class("sidearm-schedule-title", "sidearm-schedule-home-game"))
+STATE_FARM_LISTING_SECTIONS = SoupStrainer("a", class_=has_class("buttons-hide"))
+STATE_FARM_EVENT_SECTIONS = SoupStrainer(["h1", "div", "ul"], class_=has_class("title", "description_inner", "eventDetailList"))
+
+# Every strainer by name, used by the parsing benchmark
+SECTIONS = {
+    "general_listing": GENERAL_LISTING_SECTIONS,
+    "general_event": GENERAL_EVENT_SECTIONS,
+    "athletics_schedule": ATHLETICS_SCHEDULE_SECTIONS,
+    "state_farm_listing": STATE_FARM_LISTING_SECTIONS,
+    "state_farm_event": STATE_FARM_EVENT_SECTIONS,
+}
+#-----------------------PARSERS-----------------------#
+def parse_sections(html_text, sections=None):
+    """Parses only the parts of html_text matched by the sections strainer (the whole page if None).
+
+    Call decompose() on the result once done with it, so the tree is freed
+    right away instead of whenever the garbage collector gets to it.
+    """
+    return BeautifulSoup(html_text, "lxml", parse_only=sections)
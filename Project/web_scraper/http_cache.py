@@ -0,0 +1,85 @@
+#-----------------------IMPORTS & VARIABLES-----------------------#
+# Imports
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Variables & Constants
+BASE_DIR = Path(__file__).resolve().parent
+DEFAULT_CACHE_DIR = os.environ.get("SCRAPER_CACHE_DIR", str(BASE_DIR))
+DEFAULT_CACHE_PATH = os.path.join(DEFAULT_CACHE_DIR, "http_cache.sqlite3")
+#-----------------------HELPER FUNCTIONS-----------------------#
+def cache_key(url):
+    """Event pages are keyed by their eventId, so the same event listed under different calendars shares one entry"""
+    event_id = parse_qs(urlsplit(url).query).get("eventId")
+    if event_id:
+        return f"{urlsplit(url).netloc}:event:{event_id[0]}"
+    return url
+#-----------------------CACHE-----------------------#
+class HttpCache:
+    """Remembers the validators and parsed result of every page we scrape.
+
+    Entries hold the ETag/Last-Modified headers a page was served with and the
+    JSON-able value our parser produced from it. When the server answers a
+    conditional GET with 304 the stored value is reused and nothing is parsed.
+    Bumping ``version`` (e.g. after changing a parser) throws every entry away.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, version=1):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                parsed TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+
+        # Drop every entry if the parsers changed since they were stored
+        row = self.connection.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+        if row is None or row[0] != str(version):
+            self.connection.execute("DELETE FROM pages")
+            self.connection.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (str(version),))
+        self.connection.commit()
+
+    def get(self, url):
+        """Returns the stored entry for a url as a dict, or None"""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT etag, last_modified, parsed FROM pages WHERE key = ?", (cache_key(url),)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"etag": row[0], "last_modified": row[1], "parsed": json.loads(row[2])}
+
+    def put(self, url, etag, last_modified, parsed):
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+                (cache_key(url), url, etag, last_modified, json.dumps(parsed), time.time())
+            )
+            self.connection.commit()
+
+    def conditional_headers(self, entry):
+        """Builds the If-None-Match/If-Modified-Since headers for a stored entry"""
+        headers = {}
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,69 @@
+#-----------------------IMPORTS & VARIABLES-----------------------#
+# Imports
+import json
+import os
+import modal
+from .scrape import scrape
+from .publish import publish_delta, publish_full
+
+# Variables & Constants
+PUBLISH_MODE = os.environ.get("PUBLISH_MODE", "delta") # "delta" writes only what changed, "full" overwrites every event
+#-----------------------AUTO SCRAPE-----------------------#
+# Deploy from the Project directory with: modal deploy -m web_scraper.modal_app
+# Creates the modal app
+app = modal.App("daily-scraper")
+
+# Install dependencies
+image = (
+    modal.Image.debian_slim()
+    .pip_install("Flask", "beautifulsoup4", "lxml", "playwright", "requests", "firebase_admin")
+    .run_commands("playwright install --with-deps chromium")
+    .env({"SCRAPER_CACHE_DIR": "/cache"})
+    .add_local_python_source("web_scraper", "eventflow")
+)
+
+# Keeps the page cache between daily runs
+cache_volume = modal.Volume.from_name("scraper-cache", create_if_missing=True)
+
+@app.function(
+    schedule=modal.Cron("0 9 * * *"),  # Every day at 9 AM UTC
+    image=image,
+    secrets=[modal.Secret.from_name("firebase-creds")], # Gets our Firebase credentials from our secrets
+    volumes={"/cache": cache_volume}
+)
+def run_scraper():
+    import firebase_admin
+    from firebase_admin import credentials, db
+
+    print("Initializing Firebase...")
+
+    # Initialize Firebase Realtime Database with service account credentials from Modal secret
+    # You need to get your database URL from Firebase Console
+    if not firebase_admin._apps:
+        cred_dict = json.loads(os.environ['FIREBASE_CREDENTIALS'])
+        cred = credentials.Certificate(cred_dict)
+        firebase_admin.initialize_app(cred, {
+            'databaseURL': os.environ.get('FIREBASE_DATABASE_URL', 'https://eventflowdatabase-default-rtdb.firebaseio.com')
+        })
+
+    # Run the scrape function from scrape.py
+    print("Running scraper...")
+    scraped_data = scrape()
+    print(f"Scraper completed! Scraped {len(scraped_data)} events")
+
+    ref = db.reference("/scraped_events")
+    scraped_data = {event_id: event_info.to_dict() for event_id, event_info in scraped_data.items()}
+    if PUBLISH_MODE == "full":
+        publish_full(ref, scraped_data)
+    else:
+        changes = publish_delta(ref, scraped_data)
+        print(f"Published {changes['added']} new, {changes['changed']} changed and {changes['removed']} removed events")
+
+    # Save the page cache and publish manifest for tomorrow's run
+    cache_volume.commit()
+
+    print("✅ Data saved to Firebase Realtime Database!")
+#-----------------------LOCAL TESTS-----------------------#
+@app.local_entrypoint()
+def test():
+    run_scraper.remote()
@@ -0,0 +1,61 @@
+#-----------------------IMPORTS & VARIABLES-----------------------#
+# Imports
+from pathlib import Path
+import json
+import os
+from eventflow import catalog_dict, event_hash, diff_events
+
+# Variables & Constants
+BASE_DIR = Path(__file__).resolve().parent
+MANIFEST_PATH = os.path.join(os.environ.get("SCRAPER_CACHE_DIR", str(BASE_DIR)), "publish_manifest.json")
+MAX_PATHS_PER_UPDATE = 1000     # Keeps a single update() request from growing without bound
+#-----------------------HELPER FUNCTIONS-----------------------#
+def load_manifest(path=MANIFEST_PATH):
+    """Returns the {event id: hash} map saved by the last publish, or None if there isn't one"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+def snapshot_manifest(ref):
+    """Builds a manifest from what is currently in the database, used when no local manifest exists"""
+    snapshot = catalog_dict(ref.get())
+    return {event_id: event_hash(event) for event_id, event in snapshot.items()}
+#-----------------------PUBLISHERS-----------------------#
+def publish_full(ref, events, manifest_path=MANIFEST_PATH):
+    """Overwrites the whole node, then records what was written"""
+    ref.set(events)
+    save_manifest({event_id: event_hash(event_info) for event_id, event_info in events.items()}, manifest_path)
+
+def publish_delta(ref, events, manifest_path=MANIFEST_PATH):
+    """Writes only the events that changed since the last publish.
+
+    Added and changed events and removed ids (as None) go out together in one
+    multi-path update(), split only if there are more than MAX_PATHS_PER_UPDATE.
+    Returns a dict with the number of added, changed and removed events.
+    """
+    previous_manifest = load_manifest(manifest_path)
+    if previous_manifest is None:
+        print("No publish manifest found, reading the current snapshot instead...")
+        previous_manifest = snapshot_manifest(ref)
+
+    added, changed, removed = diff_events(previous_manifest, events)
+
+    # Writing None to a path deletes it
+    updates = {event_id: events[event_id] for event_id in added + changed}
+    updates.update({event_id: None for event_id in removed})
+
+    paths = list(updates)
+    for i in range(0, len(paths), MAX_PATHS_PER_UPDATE):
+        ref.update({path: updates[path] for path in paths[i:i + MAX_PATHS_PER_UPDATE]})
+
+    # Only remember the new state once every update went through
+    save_manifest({event_id: event_hash(event_info) for event_id, event_info in events.items()}, manifest_path)
+
+    return {"added": len(added), "changed": len(changed), "removed": len(removed)}
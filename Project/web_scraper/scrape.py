@@ -1,19 +1,26 @@
 #-----------------------IMPORTS & VARIABLES-----------------------#
 # Imports
-from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
-import modal
 import os
-from playwright.sync_api import sync_playwright 
 import re
-import requests
-import firebase_admin
-from firebase_admin import credentials, db
-import json
+import threading
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from eventflow import Event
+from .fetch import Fetcher
+from .http_cache import HttpCache
+from .browser_pool import render_pages
+from .html_parse import (
+    parse_sections,
+    GENERAL_LISTING_SECTIONS,
+    GENERAL_EVENT_SECTIONS,
+    ATHLETICS_SCHEDULE_SECTIONS,
+    STATE_FARM_LISTING_SECTIONS,
+    STATE_FARM_EVENT_SECTIONS
+)
+from .dates import parse_general_date, parse_state_farm_date, parse_athletics_dates
+from .dedupe import dedupe_events
 
 # Variables & Constants
-global event_count
 GENERAL_CALENDAR_LINKS = [
     "https://calendars.illinois.edu/list/7",
     "https://calendars.illinois.edu/list/557",
@@ -33,403 +40,272 @@ ATHLETIC_TICKET_LINKS = [
     "https://fightingillini.com/sports/womens-basketball/schedule",
     "https://fightingillini.com/sports/womens-volleyball/schedule"
 ]
+PER_HOST_LIMIT = int(os.environ.get("SCRAPE_PER_HOST_LIMIT", 8)) # Max pages downloaded at once from one site, 1 scrapes serially
+USE_PAGE_CACHE = os.environ.get("SCRAPER_CACHE", "1") != "0" # Set SCRAPER_CACHE=0 to always download and parse every page
+BROWSER_POOL_SIZE = int(os.environ.get("SCRAPE_BROWSER_PAGES", 4)) # Headless browser pages rendering State Farm events at once
+DEDUPE = os.environ.get("SCRAPER_DEDUPE", "1") != "0" # Set SCRAPER_DEDUPE=0 to publish events listed by several sources once per listing
+PAGE_CACHE_VERSION = 4 # Bump whenever a page parser changes so stale parsed results get thrown away
+page_cache = None
+page_cache_lock = threading.Lock() # Sources start at the same time, only one of them should open the cache
 #-----------------------HELPER FUNCTIONS-----------------------#
-def parse_month_to_number(month_str):
-    try:
-        return datetime.strptime(month_str, "%B").month
-    except ValueError:
-        return datetime.strptime(month_str, "%b").month
+def get_cache():
+    """Opens the shared on-disk page cache once per process, or returns None when caching is turned off"""
+    global page_cache
+    with page_cache_lock:
+        if page_cache is None and USE_PAGE_CACHE:
+            page_cache = HttpCache(version=PAGE_CACHE_VERSION)
+    return page_cache
+
+def make_event_id(event_info):
+    """Stable key for an event, the same event gets the same id on every run"""
+    key = "|".join([event_info.html_link or "", event_info.summary, event_info.start or ""])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
 #-----------------------SCRAPERS-----------------------#
-# Individual Scrapers
-def scrape_general():
-    global event_count
-    session = requests.Session()
-    events = {}
-    used = []
-
-    for calendar_link in GENERAL_CALENDAR_LINKS:
-        # Scrapes the calendar page
-        html_text = session.get(calendar_link).text
-        soup = BeautifulSoup(html_text, "lxml")
-        event_listings = soup.find_all("div", class_="title")
-
-        # Gets info for each event
-        for i in range(0, len(event_listings)):
-            event_link = "https://calendars.illinois.edu/" + event_listings[i].find("a").attrs["href"]
-            
-            event_id = event_link.split("eventId=")[1]
-            if event_id in used:
-                continue
-            else:
-                used.append(event_id)
-
-            event_info = {}
-
-            # Scrapes the html from the event page
-            html_text = session.get(event_link).text
-            soup = BeautifulSoup(html_text, "lxml")
-            event = soup.find("section", class_="detail-content")
-
-            # Name of the event
-            name_tag = event.find("h2").text
-            if name_tag:
-                event_name = name_tag.strip()
-            else: 
-                event_name = "Unknown Event Name"
-            event_info["summary"] = event_name
-
-            # Description for the event, if given
-            event_info["description"] = ""
-            desc = event.find("dd", class_="ws-description")
-            if desc != None:
-                event_info["description"] = desc.text
-
-            # Link for the event
-            event_info["htmlLink"] = event_link
-            
-            # The rest of the details are stored in a dl, convert dt's and dd's into a dictionary
-            details = dict(zip(
-                        [detail.text.strip().lower().replace(" ", "_") for detail in event.find_all("dt")], 
-                        [detail.text for detail in event.find_all("dd")]
-                        ))
-                        
-            # Put each detail into our event_info dict
-            for key in details:
-                match key:
-                    case "date":
-                        date_string = details[key]
-                        try:
-                            # Initialize variables
-                            month = day = year = None
-                            start_hour = start_minute = end_hour = end_minute = None
-
-                            # Parse dates - "Month Day, Year" or "Month Day, Year - Month Day, Year"
-                            if date_match := re.search(r"(\w+)\s+(\d{1,2}),\s+(\d{4})", date_string):
-                                month = date_match.group(1)
-                                day = int(date_match.group(2))
-                                year = int(date_match.group(3))
-
-                            # Parse times - handle formats like "6:30 - 8:00 am" or "6:30 am - 8:00 pm"
-                            # First check for time range with format "H:MM - H:MM am/pm" or "H:MM am - H:MM pm"
-                            if time_range_match := re.search(r"(\d{1,2}):(\d{2})\s*(am|pm)?\s*-\s*(\d{1,2}):(\d{2})\s*(am|pm)", date_string, re.IGNORECASE):
-                                # Start time
-                                start_hour = int(time_range_match.group(1))
-                                start_minute = int(time_range_match.group(2))
-                                start_meridiem = time_range_match.group(3)  # May be None
-
-                                # End time
-                                end_hour = int(time_range_match.group(4))
-                                end_minute = int(time_range_match.group(5))
-                                end_meridiem = time_range_match.group(6).lower()
-
-                                # If start time doesn't have am/pm, use the end time's am/pm
-                                if not start_meridiem:
-                                    start_meridiem = end_meridiem
-                                else:
-                                    start_meridiem = start_meridiem.lower()
-
-                                # Convert start time to 24-hour
-                                if start_meridiem == "pm" and start_hour != 12:
-                                    start_hour += 12
-                                elif start_meridiem == "am" and start_hour == 12:
-                                    start_hour = 0
-
-                                # Convert end time to 24-hour
-                                if end_meridiem == "pm" and end_hour != 12:
-                                    end_hour += 12
-                                elif end_meridiem == "am" and end_hour == 12:
-                                    end_hour = 0
-
-                            elif time_match := re.search(r"(\d{1,2}):(\d{2})\s*(am|pm)", date_string, re.IGNORECASE):
-                                # Single time only
-                                start_hour = int(time_match.group(1))
-                                start_minute = int(time_match.group(2))
-                                start_meridiem = time_match.group(3).lower()
-
-                                # Convert to 24-hour
-                                if start_meridiem == "pm" and start_hour != 12:
-                                    start_hour += 12
-                                elif start_meridiem == "am" and start_hour == 12:
-                                    start_hour = 0
-
-                                # Default end time to 2 hours after start
-                                end_hour = (start_hour + 2) % 24
-                                end_minute = start_minute
-                            else:
-                                # No time found - all day event
-                                start_hour, start_minute = 0, 0
-                                end_hour, end_minute = 23, 59
-
-                            # Build ISO format dates using Central Time
-                            if None not in (month, day, year, start_hour, start_minute):
-                                start_dt = datetime(year, parse_month_to_number(month), day, start_hour, start_minute, tzinfo=ZoneInfo("America/Chicago"))
-                                event_info["start"] = start_dt.isoformat()
-                            else:
-                                event_info["start"] = ""
-
-                            if None not in (month, day, year, end_hour, end_minute):
-                                end_dt = datetime(year, parse_month_to_number(month), day, end_hour, end_minute, tzinfo=ZoneInfo("America/Chicago"))
-                                event_info["end"] = end_dt.isoformat()
-                            else:
-                                event_info["end"] = ""
-                        except Exception:
-                            # If parsing fails, set empty dates
-                            event_info["start"] = ""
-                            event_info["end"] = ""
-                    case "location":
-                        event_info["location"] = details[key]
-                    case "event_type":
-                        event_info["tag"] = details[key]
-
-            # Cleanup all the values in the dictionary
-            event_info = {
-                key: value.strip() if isinstance(value, str) else value
-                for key, value in event_info.items()
-            }
-
-            # Add event info to the main dictionary
-            events[event_count] = event_info
-            event_count += 1
+# Page Parsers
+def parse_general_event(html_text, event_link):
+    """Parses a calendars.illinois.edu event page into an Event"""
+    event_info = Event()
+
+    # Parses the html from the event page
+    soup = parse_sections(html_text, GENERAL_EVENT_SECTIONS)
+    event = soup.find("section", class_="detail-content")
+
+    # Name of the event
+    name_tag = event.find("h2").text
+    if name_tag:
+        event_name = name_tag.strip()
+    else: 
+        event_name = "Unknown Event Name"
+    event_info.summary = event_name
+
+    # Description for the event, if given
+    desc = event.find("dd", class_="ws-description")
+    if desc != None:
+        event_info.description = desc.text
+
+    # Link for the event
+    event_info.html_link = event_link
+    
+    # The rest of the details are stored in a dl, convert dt's and dd's into a dictionary
+    details = dict(zip(
+                [detail.text.strip().lower().replace(" ", "_") for detail in event.find_all("dt")], 
+                [detail.text for detail in event.find_all("dd")]
+                ))
+                
+    # Put each detail into our event
+    for key in details:
+        match key:
+            case "date":
+                event_info.start, event_info.end = parse_general_date(details[key])
+            case "location":
+                event_info.location = details[key]
+            case "event_type":
+                event_info.tag = details[key]
+
+    soup.decompose()
+    return event_info.strip()
+
+def parse_general_listing(html_text):
+    """Parses a calendars.illinois.edu list page into the links of the events on it"""
+    soup = parse_sections(html_text, GENERAL_LISTING_SECTIONS)
+    event_listings = soup.find_all("div", class_="title")
+    event_links = ["https://calendars.illinois.edu/" + event_listings[i].find("a").attrs["href"] for i in range(0, len(event_listings))]
+    soup.decompose()
+    return event_links
+
+def parse_athletics_listing(html_text, calendar_link):
+    """Parses a fightingillini.com schedule page into one dict per home game, with the date and time as printed
+    and the season from the schedule's title. Nothing here depends on today, so the result can be cached"""
+    games = []
+
+    # Parses the calendar page
+    soup = parse_sections(html_text, ATHLETICS_SCHEDULE_SECTIONS)
+    event_listings = soup.find_all("li", class_="sidearm-schedule-home-game")
+
+    # Season and type of sport info, the season gives the year and the sport is used for the title
+    if title_match := re.match(r"([\d-]+) (.*) Schedule", soup.find("div", class_="sidearm-schedule-title").find("h2").text):
+        season, sport = title_match.group(1), title_match.group(2)
+    else:
+        season, sport = "", "Sport"
+
+    for i in range(0, len(event_listings)):
+        # Title of the event and its link
+        opponent = event_listings[i].find("div", class_="sidearm-schedule-game-opponent-name").find("a").text
+        game = {"summary": f"{sport} Game: Illinois VS. {opponent}", "html_link": calendar_link, "season": season}
+
+        # Date of the event - "Month Day" and "H:MM am/pm"
+        try:
+            date_info = event_listings[i].find("div", class_="sidearm-schedule-game-opponent-date").find_all("span")
+            game["date_text"], game["time_text"] = date_info[0].text, date_info[1].text
+        except Exception:
+            game["date_text"], game["time_text"] = "", ""
+
+        # Location of the event
+        location_info = event_listings[i].find("div", class_="sidearm-schedule-game-location").find_all("span")
+        if len(location_info) > 1:
+            game["location"] = f"{location_info[1].text}, {location_info[0].text}"
+        else:
+            game["location"] = f"{location_info[0].text}"
 
+        games.append(game)
+
+    soup.decompose()
+    return games
+
+def athletics_events(games, today=None):
+    """Turns parsed schedule games into Events, the year of each game comes from its season. The tag is hard coded"""
+    dates = parse_athletics_dates([(game["date_text"], game["time_text"], game["season"]) for game in games], today)
+    events = []
+    for game, (start, end) in zip(games, dates):
+        event_info = Event(summary=game["summary"], html_link=game["html_link"], start=start, end=end, location=game["location"], tag="Athletics")
+        events.append(event_info.strip())
     return events
 
-def scrape_state_farm():
-    global event_count
-    events = {}
-    
-    html_text = requests.get(STATE_FARM_CENTER_CALENDAR_LINK).text
-    soup = BeautifulSoup(html_text, "lxml")
+def parse_athletics_schedule(html_text, calendar_link, today=None):
+    """Parses a fightingillini.com schedule page into a list of Events, one per home game"""
+    return athletics_events(parse_athletics_listing(html_text, calendar_link), today)
+
+def parse_state_farm_listing(html_text):
+    """Parses the State Farm Center events page into the links of the events on it"""
+    soup = parse_sections(html_text, STATE_FARM_LISTING_SECTIONS)
     event_listings = soup.find_all("a", class_="more buttons-hide")
+    event_links = [event_listings[i].attrs["href"] for i in range(0, len(event_listings))]
+    soup.decompose()
+    return event_links
 
-    # Emulates a browser to handle the dynamic content
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page(user_agent="Mozilla/5.0")
-        for i in range(0, len(event_listings)):
-            event_link = event_listings[i].attrs["href"]
-            event_info = {}
-
-            # Get all the static html content
-            page.goto(event_link, wait_until="domcontentloaded")
-            soup = BeautifulSoup(page.content(), "lxml")
-
-            # Name of the event
-            event_info["summary"] = soup.find("h1", class_="title").text
-
-            # Description for the event, if given
-            event_info["description"] = ""
-            desc = soup.find("div", class_="description_inner")
-            if desc != None:
-                event_info["description"] = " ".join([text.text for text in desc.find_all("p")])
-
-            # Link for the event
-            event_info["htmlLink"] = event_link
-
-            # Hard-Coded data, same for all events
-            event_info["location"] = "State Farm Center 1800 S 1st St, Champaign, IL 61820"
-            event_info["tag"] = "Entertainment"
-
-            # Date data
-            try:
-                sidebar = soup.find("ul", class_="eventDetailList")
-
-                # Extract date components
-                month = sidebar.find("span", class_="m-date__month").text.strip()
-                day = int(re.sub(r'\D', '', sidebar.find("span", class_="m-date__day").text.strip()))
-                year = int(re.sub(r'\D', '', sidebar.find("span", class_="m-date__year").text.strip()))
-
-                # Parse time - "H:MM am/pm" or "HH:MM am/pm"
-                start_time_str = sidebar.find("li", class_="item sidebar_event_starts").find("span").text.strip()
-
-                if time_match := re.search(r"(\d{1,2}):(\d{2})\s*(am|pm)", start_time_str, re.IGNORECASE):
-                    hour = int(time_match.group(1))
-                    minute = int(time_match.group(2))
-                    meridiem = time_match.group(3).lower()
-
-                    # Convert to 24-hour
-                    if meridiem == "pm" and hour != 12:
-                        hour += 12
-                    elif meridiem == "am" and hour == 12:
-                        hour = 0
-
-                    start_dt = datetime(year, parse_month_to_number(month), day, hour, minute, tzinfo=ZoneInfo("America/Chicago"))
-                    end_dt = start_dt + timedelta(hours=3)
-                    event_info["start"] = start_dt.isoformat()
-                    event_info["end"] = end_dt.isoformat()
-                else:
-                    event_info["start"] = ""
-                    event_info["end"] = ""
-            except Exception:
-                event_info["start"] = ""
-                event_info["end"] = ""
+def parse_state_farm_event(html_text, event_link, require_sidebar=False):
+    """Parses a State Farm Center event page into an Event.
+    With require_sidebar, returns None if the page has no eventDetailList sidebar yet"""
+    event_info = Event()
 
-            # Cleanup all the values in the dictionary
-            event_info = {
-                key: value.strip() if isinstance(value, str) else value
-                for key, value in event_info.items()
-            }
+    # Parses the html from the event page
+    soup = parse_sections(html_text, STATE_FARM_EVENT_SECTIONS)
+    sidebar = soup.find("ul", class_="eventDetailList")
 
-            # Add event info to the main dictionary
-            events[event_count] = event_info
-            event_count += 1
+    # The sidebar is missing when the page builds it with javascript
+    if sidebar is None and require_sidebar:
+        soup.decompose()
+        return None
 
-        # Close the browser
-        browser.close()
+    # Name of the event
+    event_info.summary = soup.find("h1", class_="title").text
 
-    return events
+    # Description for the event, if given
+    desc = soup.find("div", class_="description_inner")
+    if desc != None:
+        event_info.description = " ".join([text.text for text in desc.find_all("p")])
 
-def scrape_athletics():
-    global event_count
-    session = requests.Session()
-    events = {}
+    # Link for the event
+    event_info.html_link = event_link
 
-    for calendar_link in ATHLETIC_TICKET_LINKS:
-        # Scrapes the calendar page
-        html_text = session.get(calendar_link).text
-        soup = BeautifulSoup(html_text, "lxml")
-        event_listings = soup.find_all("li", class_="sidearm-schedule-home-game")
+    # Hard-Coded data, same for all events
+    event_info.location = "State Farm Center 1800 S 1st St, Champaign, IL 61820"
+    event_info.tag = "Entertainment"
 
-        # Type of sport info, used for the title
-        if sport := re.match(r"[\d-]+ (.*) Schedule", soup.find("div", class_="sidearm-schedule-title").find("h2").text):
-            sport = sport.group(1)
-        else:
-            sport = "Sport"
-
-        for i in range(0, len(event_listings)):
-            event_info = {}
-
-            # Title of the event
-            opponent = event_listings[i].find("div", class_="sidearm-schedule-game-opponent-name").find("a").text
-            event_info["summary"] = f"{sport} Game: Illinois VS. {opponent}"
-
-            # Hard coded values
-            event_info["description"] = ""
-            event_info["tag"] = "Athletics"
-
-            # Link for the event
-            event_info["htmlLink"] = calendar_link
-
-            # Date of the event
-            try:
-                date_info = event_listings[i].find("div", class_="sidearm-schedule-game-opponent-date").find_all("span")
-
-                # Parse date - "Month Day"
-                if date_match := re.search(r"(\w+)\s+(\d+)", date_info[0].text):
-                    month = date_match.group(1)
-                    day = int(date_match.group(2))
-
-                    # Determine year based on month
-                    if month in ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul"]:
-                        year = datetime.now().year + 1
-                    else:
-                        year = datetime.now().year
-
-                    # Parse time - "H:MM am/pm" or "HH:MM am/pm"
-                    if time_match := re.search(r"(\d{1,2}):?(\d{2})?\s*(am|pm)", date_info[1].text, re.IGNORECASE):
-                        hour = int(time_match.group(1))
-                        minute = int(time_match.group(2)) if time_match.group(2) else 0
-                        meridiem = time_match.group(3).lower()
-
-                        # Convert to 24-hour
-                        if meridiem == "pm" and hour != 12:
-                            hour += 12
-                        elif meridiem == "am" and hour == 12:
-                            hour = 0
-
-                        start_dt = datetime(year, parse_month_to_number(month), day, hour, minute, tzinfo=ZoneInfo("America/Chicago"))
-                        end_dt = start_dt + timedelta(hours=3)
-                        event_info["start"] = start_dt.isoformat()
-                        event_info["end"] = end_dt.isoformat()
-                    else:
-                        event_info["start"] = ""
-                        event_info["end"] = ""
+    # Date data
+    try:
+        # Extract date components
+        month = sidebar.find("span", class_="m-date__month").text
+        day = sidebar.find("span", class_="m-date__day").text
+        year = sidebar.find("span", class_="m-date__year").text
+
+        # Parse time - "H:MM am/pm" or "HH:MM am/pm"
+        start_time_str = sidebar.find("li", class_="item sidebar_event_starts").find("span").text
+        event_info.start, event_info.end = parse_state_farm_date(month, day, year, start_time_str)
+    except Exception:
+        event_info.start = ""
+        event_info.end = ""
+
+    soup.decompose()
+    return event_info.strip()
+
+# Individual Scrapers
+def scrape_general(per_host_limit=PER_HOST_LIMIT):
+    used = set()
+
+    with Fetcher(per_host_limit=per_host_limit, cache=get_cache()) as fetcher:
+        # Scrapes every calendar page at once
+        calendar_listings = fetcher.map(lambda calendar_link: fetcher.get_parsed(calendar_link, parse_general_listing), GENERAL_CALENDAR_LINKS)
+
+        # Collects the event links in calendar order, skipping events listed in more than one calendar
+        event_links = []
+        for event_listing in calendar_listings:
+            for event_link in event_listing:
+                event_id = event_link.split("eventId=")[1]
+                if event_id in used:
+                    continue
                 else:
-                    event_info["start"] = ""
-                    event_info["end"] = ""
-
-            except Exception:
-                event_info["start"] = ""
-                event_info["end"] = ""
-
-            # Location of the event
-            location_info = event_listings[i].find("div", class_="sidearm-schedule-game-location").find_all("span")
-            if len(location_info) > 1:
-                event_info["location"] = f"{location_info[1].text}, {location_info[0].text}"
-            else:
-                event_info["location"] = f"{location_info[0].text}"
-
-            # Cleanup
-            event_info = {
-                key: value.strip() if isinstance(value, str) else value
-                for key, value in event_info.items()
-            }
-
-            events[event_count] = event_info
-            # Increment event counter
-            event_count += 1
+                    used.add(event_id)
+
+                event_links.append(event_link)
+
+        # Scrapes every event page at once, parsing each one as soon as it downloads
+        events = fetcher.map(lambda event_link: scrape_general_event(fetcher, event_link), event_links)
+
+    # Events come back in the same order as the calendars list them
     return events
 
-# Scrape All Function
-def scrape():
-    global event_count
-    event_count = 0
-    combined_data = {}
+def scrape_general_event(fetcher, event_link):
+    # The page cache stores plain JSON, so events go in as dicts and come back out as Events
+    event_info = Event.from_dict(fetcher.get_parsed(event_link, lambda html_text: parse_general_event(html_text, event_link).to_dict()))
 
-    state_farm_data = scrape_state_farm()
-    combined_data = combined_data | state_farm_data
+    # Cached pages are shared by eventId, so keep the link from the calendar we found it on
+    event_info.html_link = event_link
+    return event_info
 
-    athletics_data = scrape_athletics()
-    combined_data = combined_data | athletics_data
+def scrape_state_farm(per_host_limit=PER_HOST_LIMIT, browser_pages=BROWSER_POOL_SIZE):
+    with Fetcher(per_host_limit=per_host_limit) as fetcher:
+        event_links = parse_state_farm_listing(fetcher.get(STATE_FARM_CENTER_CALENDAR_LINK))
 
-    general_data = scrape_general()
-    combined_data = combined_data | general_data
+        # Fast path, most event pages already have the sidebar in their static html
+        event_infos = fetcher.map(lambda event_link: parse_state_farm_event(fetcher.get(event_link), event_link, require_sidebar=True), event_links)
 
-    return combined_data
-#-----------------------AUTO SCRAPE-----------------------#
-# Creates the modal app
-app = modal.App("daily-scraper")
-
-# Install dependencies
-image = (
-    modal.Image.debian_slim()
-    .pip_install("Flask", "beautifulsoup4", "lxml", "playwright", "requests", "firebase_admin")
-    .run_commands("playwright install --with-deps chromium")
-)
+    # Emulates a browser to handle the dynamic content, only for the pages that need it
+    dynamic = [i for i in range(0, len(event_links)) if event_infos[i] is None]
+    rendered_pages = render_pages([event_links[i] for i in dynamic], pool_size=browser_pages)
+    for i, html_text in zip(dynamic, rendered_pages):
+        event_infos[i] = parse_state_farm_event(html_text, event_links[i])
 
-@app.function(
-    schedule=modal.Cron("0 9 * * *"),  # Every day at 9 AM UTC
-    image=image,
-    secrets=[modal.Secret.from_name("firebase-creds")] # Gets our Firebase credentials from our secrets
-)
-def run_scraper():
-    print("Initializing Firebase...")
-
-    # Initialize Firebase Realtime Database with service account credentials from Modal secret
-    # You need to get your database URL from Firebase Console
-    if not firebase_admin._apps:
-        cred_dict = json.loads(os.environ['FIREBASE_CREDENTIALS'])
-        cred = credentials.Certificate(cred_dict)
-        firebase_admin.initialize_app(cred, {
-            'databaseURL': os.environ.get('FIREBASE_DATABASE_URL', 'https://eventflowdatabase-default-rtdb.firebaseio.com')
-        })
-
-    # Get Realtime Database reference
-    ref = db.reference('scraped_events')
-
-    # Run the scrape function from scrape.py
-    print("Running scraper...")
-    scraped_data = scrape()
-    print(f"Scraper completed! Scraped {len(scraped_data)} events")
-
-    ref = db.reference("/scraped_events")
-    ref.set(scraped_data)
-
-    print("✅ Data saved to Firebase Realtime Database!")
-#-----------------------LOCAL TESTS-----------------------#
-@app.local_entrypoint()
-def test():
-    run_scraper.remote()
+    return event_infos
+
+def scrape_athletics(per_host_limit=PER_HOST_LIMIT):
+    # Scrapes every schedule page at once. Cached schedules hold the dates as printed, without a year
+    with Fetcher(per_host_limit=per_host_limit, cache=get_cache()) as fetcher:
+        schedules = fetcher.map(lambda calendar_link: fetcher.get_parsed(calendar_link, lambda html_text: parse_athletics_listing(html_text, calendar_link)), ATHLETIC_TICKET_LINKS)
+
+    # Flatten into one list, in schedule order. Years are worked out after the cache, from each schedule's season
+    games = [game for schedule in schedules for game in schedule]
+    return athletics_events(games)
+
+# Scrape All Function
+def scrape():
+    combined_data = {}
+
+    # Runs every source at the same time, so the whole scrape takes as long as the slowest one
+    with ThreadPoolExecutor(max_workers=len(SOURCES)) as executor:
+        results = [executor.submit(source) for source in SOURCES]
+
+        # Merge in source order, keyed by an id derived from each event's content
+        for result in results:
+            for event_info in result.result():
+                event_id = make_event_id(event_info)
+
+                # Identical events listed twice get a numbered suffix instead of overwriting each other
+                unique_id, copy = event_id, 1
+                while unique_id in combined_data:
+                    copy += 1
+                    unique_id = f"{event_id}-{copy}"
+                combined_data[unique_id] = event_info
+
+    # The same event listed by several calendars or sources is published once
+    if DEDUPE:
+        combined_data = dedupe_events(combined_data)
+    return combined_data
 
+# Every scraper, in the order their events are merged
+SOURCES = [scrape_state_farm, scrape_athletics, scrape_general]
+#-----------------------LOCAL RUN-----------------------#
+# The daily Modal run lives in modal_app.py, so running or importing the scraper never loads modal
 def main():
     scrape()
 